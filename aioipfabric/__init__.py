@@ -13,11 +13,49 @@
 #  limitations under the License.
 #
 
-from aioipfabric.client import IPFabricClient
+"""
+The client classes are imported on first access (PEP 562) so that importing a
+submodule, for example `aioipfabric.filters`, does not also import the client
+and the httpx package.
+"""
 
-from aioipfabric.base_client import (
-    table_api,
-    IPFBaseClient as IPFabricClientMixin,
-)
+from typing import TYPE_CHECKING
+from importlib import import_module
 
-__all__ = [IPFabricClient, IPFabricClientMixin, table_api]
+# the table_api decorator is imported eagerly, since it does not depend on
+# httpx, and so that the package attribute is the decorator rather than the
+# `table_api` submodule.
+
+from aioipfabric.table_api import table_api
+
+# static analysis tools, and IDEs, do not evaluate __getattr__, and so the lazy
+# exports are also imported here for their benefit.
+
+if TYPE_CHECKING:
+    from aioipfabric.client import IPFabricClient
+    from aioipfabric.base_client import IPFBaseClient as IPFabricClientMixin
+
+__all__ = ["IPFabricClient", "IPFabricClientMixin", "table_api"]
+
+# export name -> (module, attribute)
+
+_LAZY_EXPORTS = {
+    "IPFabricClient": ("aioipfabric.client", "IPFabricClient"),
+    "IPFabricClientMixin": ("aioipfabric.base_client", "IPFBaseClient"),
+}
+
+
+def __getattr__(name):
+    """import the export on first access, and then retain it in the package"""
+    try:
+        module, attr = _LAZY_EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = globals()[name] = getattr(import_module(module), attr)
+    return value
+
+
+def __dir__():
+    """include the lazy exports"""
+    return sorted({*globals(), *__all__})
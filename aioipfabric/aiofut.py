@@ -1,3 +1,11 @@
+"""
+This module provides an `as_completed` async generator that yields the
+completed tasks such that the originating coroutine can be retrieved.  The
+client code no longer uses it, since the coroutines return the values needed
+by the Caller; the module is retained for backwards compatibility with
+existing Caller code that imports it.
+"""
+
 from typing import AsyncIterable, Iterable, Coroutine, Optional
 import asyncio
 from asyncio import Task
@@ -17,16 +17,26 @@
 # System Imports
 # -----------------------------------------------------------------------------
 
-from typing import Optional
-from dataclasses import dataclass
+from typing import Optional, Iterable, Awaitable, List, Final
+from itertools import islice
+from importlib.util import find_spec
+from functools import lru_cache
+from contextlib import asynccontextmanager
+from time import monotonic
 import asyncio
+import ssl
 
 # -----------------------------------------------------------------------------
 # Public Imports
 # -----------------------------------------------------------------------------
 
-from httpx import AsyncClient
-from tenacity import retry, wait_exponential
+from httpx import AsyncClient, Limits, create_ssl_context
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from .jsonlib import loads, dumps
 
 # -----------------------------------------------------------------------------
 # Exports
@@ -42,12 +52,51 @@ __all__ = ["IPFSession"]
 # -----------------------------------------------------------------------------
 
 
-@dataclass
-class URIs:
-    """identifies API URL endpoings used"""
+# API URL endpoints used
+
+LOGIN_URI: Final = "auth/login"
+TOKEN_REFRESH_URI: Final = "auth/token"
+
+
+# HTTP/2 is used by default when the h2 package is available; otherwise the
+# client uses HTTP/1.1.
+
+_HTTP2_AVAILABLE = find_spec("h2") is not None
+
+
+@lru_cache(maxsize=None)
+def _insecure_ssl_context(http2: bool) -> ssl.SSLContext:
+    """
+    Returns the SSL context used when the Caller does not provide a `verify`
+    or `cert` option; that is the IPF system certificate is not verified.  The
+    context is created once per process, rather than per client, and shared;
+    and so must not be modified, for example by loading a client certificate.
+    """
+    return create_ssl_context(verify=False, http2=http2)
+
+
+class _RateLimiter(object):
+    """
+    Token-bucket used to pace requests to a maximum rate (requests per
+    second), independent of the number of concurrent requests.  Callers that
+    find the bucket empty reserve the next token and sleep until it is
+    available, so waiting callers are served in the order they arrived.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = self.capacity = max(1.0, rate)
+        self.updated = monotonic()
 
-    login = "auth/login"
-    token_refresh = "auth/token"
+    async def acquire(self):
+        """wait until a request may be sent"""
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
 
 
 class IPFSession(AsyncClient):
@@ -61,11 +110,23 @@ class IPFSession(AsyncClient):
     """
 
     API_THROTTLE = 100
+    API_THROTTLE_RAMP = 20
+    API_BATCH_SIZE = 20
     API_DEFAULT_TIMEOUT = 30
+    API_KEEPALIVE_EXPIRY = 30
+    API_RETRY_ATTEMPTS = 10
+    API_RETRY_MIN_WAIT = 4.0
+    API_RETRY_MAX_WAIT = 10.0
     API_HEADER_TOKEN = "X-API-Token"
 
     def __init__(
-        self, base_url, token=None, username=None, password=None, **clientopts
+        self,
+        base_url,
+        token=None,
+        username=None,
+        password=None,
+        refresh_token=None,
+        **clientopts,
     ):
         """
         Initialize the asyncio client session to the IP Fabric API
@@ -84,39 +145,140 @@ class IPFSession(AsyncClient):
         password: str
             The login password
 
+        refresh_token: str
+            A refresh token from a prior login, used instead of the login
+            credentials; for example the `token` of a prior session.
+
         Other Parameters
         ----------------
         Any additional `clientopts` are passed to the httpx.AsyncClient instance
         init as-is so that the Caller has further controls.  The `clientopts`
         may also include an optional key `API_THROTTLE` that is used to
-        semaphore protect the number of concurrent requests. If this option is
-        not provided, then the class default value is used.
+        limit the number of concurrent requests. If this option is not
+        provided, then the class default value is used.  The limit can be
+        changed at runtime using `set_concurrency`.
+
+        The concurrency limit is adjusted automatically based on the API
+        responses: the limit is halved each time the IP Fabric system responds
+        with a 429 (Too Many Requests), and increased by one after
+        `API_THROTTLE_RAMP` consecutive successful responses; but never more
+        than the `API_THROTTLE` value.
+
+        The connection pool is sized to match the `API_THROTTLE` value so that
+        each concurrent request can reuse a keep-alive connection.  The
+        `clientopts` may include the key `keepalive_expiry` (seconds) to change
+        the idle connection expiry, or `limits` to provide an httpx.Limits
+        instance as-is.
+
+        HTTP/2 is enabled by default when the h2 package is installed, so that
+        concurrent requests are multiplexed over a single connection; if the
+        IPF system does not negotiate HTTP/2 then HTTP/1.1 is used.  Use
+        `http2=False` to disable.
+
+        By default the IPF system certificate is not verified.  The
+        `clientopts` may include the key `verify`, as defined by httpx, to
+        enable verification; for example `verify=True` or the path to a CA
+        bundle file.  When the `clientopts` include the httpx `cert` option,
+        the client certificate is loaded into an SSL context for this session
+        only.
+
+        The `clientopts` may also include an optional key `API_BATCH_SIZE` that
+        is used as the default batch size of the `gather` method.
+
+        The `clientopts` may also include an optional key `API_RPS` that is
+        used to limit the rate of requests (requests per second) sent to the
+        IPF system.  This limit is applied in addition to the `API_THROTTLE`
+        concurrency limit.  By default there is no rate limit.
         """
-        api_throttle = clientopts.pop("API_THROTTLE", None)
+        api_throttle = clientopts.pop("API_THROTTLE", None) or self.API_THROTTLE
+        self.batch_size = clientopts.pop("API_BATCH_SIZE", None) or self.API_BATCH_SIZE
+        api_rps = clientopts.pop("API_RPS", None)
+        keepalive_expiry = clientopts.pop("keepalive_expiry", self.API_KEEPALIVE_EXPIRY)
+        http2 = clientopts.pop("http2", _HTTP2_AVAILABLE)
+
+        # the shared SSL context is only used when httpx does not need to
+        # create, or modify, a context for this session.
+
+        if (verify := clientopts.pop("verify", None)) is None:
+            verify = False if clientopts.get("cert") else _insecure_ssl_context(http2)
 
         super().__init__(
             base_url=base_url,
             timeout=clientopts.pop("timeout", self.API_DEFAULT_TIMEOUT),
-            verify=False,
+            limits=clientopts.pop(
+                "limits",
+                Limits(
+                    max_connections=api_throttle,
+                    max_keepalive_connections=api_throttle,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+            ),
+            http2=http2,
+            verify=verify,
             **clientopts,
         )
 
-        self.__sema4 = asyncio.Semaphore(api_throttle or self.API_THROTTLE)
+        # the number of concurrent requests is gated by a counter guarded by
+        # a condition variable rather than a semaphore so that the limit can
+        # be safely changed while requests are in-flight.
+
+        self.__cmax_limit = self.__cmax = api_throttle
+        self.__active = 0
+        self.__success_streak = 0
+        self.__cond = asyncio.Condition()
+        self.__rate_limiter = _RateLimiter(api_rps) if api_rps else None
+
         self.__api_token = token
         self.__access_token = None
+        self.__bearer = None
         self.__refresh_token = None
+        self.__refresh_body = None
+        self.__refresh_inflight: Optional[asyncio.Task] = None
+
+        # select the authentication coroutine based on the provided
+        # credentials.  When using login credentials, the first call to
+        # `authenticate` will login, and any subsequent call will use
+        # `refresh_token`.
 
         if self.__api_token:
             self.headers[self.API_HEADER_TOKEN] = self.__api_token
+            self.__authenticate = self.__auth_api_token
         elif all((username, password)):
-            self.__init_auth = self.__auth_userpass(
-                username=username, password=password
-            )
+            self.__login_body = dumps(dict(username=username, password=password))
+            self.__authenticate = self.__auth_userpass
+        elif refresh_token:
+            self.__set_refresh_token(refresh_token)
+            self.__authenticate = self.refresh_token
         else:
             raise RuntimeError("MISSING required token or (username, password)")
 
         self.headers["Content-Type"] = "application/json"
 
+    @classmethod
+    async def create(
+        cls, base_url, token=None, username=None, password=None, **clientopts
+    ) -> "IPFSession":
+        """
+        This coroutine is used to create an IPFSession instance that is
+        authenticated on the running event loop.  The parameters are the same
+        as the IPFSession init.
+        """
+        api = cls(
+            base_url=base_url,
+            token=token,
+            username=username,
+            password=password,
+            **clientopts,
+        )
+
+        try:
+            await api.authenticate()
+        except Exception:
+            await api.aclose()
+            raise
+
+        return api
+
     # -------------------------------------------------------------------------
     #
     #                             Properties
@@ -128,6 +290,19 @@ class IPFSession(AsyncClient):
         """return the Refresh Token for later use/storage"""
         return self.__api_token or self.__refresh_token
 
+    @property
+    def refresh_required(self) -> bool:
+        """
+        return True if the session uses an access token that must be obtained,
+        and refreshed, from the IPF system; that is not an API token.
+        """
+        return self.__api_token is None
+
+    @property
+    def concurrency(self) -> int:
+        """return the current limit of concurrent requests"""
+        return self.__cmax
+
     # -------------------------------------------------------------------------
     #
     #                             Public Methods
@@ -140,33 +315,118 @@ class IPFSession(AsyncClient):
         access token.  This coroutine can be used for both the initial login
         process and the token refresh process.
         """
+        await self.__authenticate()
 
-        # If using the API Token approach, there is nothing to do.
+    async def refresh_token(self, token: Optional[str] = None):
+        """
+        Using the refresh token, obtain a new access token.  Concurrent calls
+        to this coroutine are coalesced so that only one refresh request is
+        made to the IPF system; all callers await the same result.
+        """
 
-        if self.__api_token:
-            return
+        if token:
+            self.__set_refresh_token(token)
+
+        if self.__refresh_token is None:
+            raise RuntimeError("MISSING required refresh token")
+
+        # there is no await between checking for and creating the in-flight
+        # refresh task, so this check-and-set is atomic with respect to the
+        # event loop.
 
-        # the first time this method is called use the coroutine as selected in
-        # the __init__ method based on the provided credentials. Any subsequent
-        # call to `authenticate` will use `refresh_token`.  The code below uses
-        # the try/except catching the RuntimeError to detect the "first use"
-        # vs. subsequent uses.
+        if (refresh := self.__refresh_inflight) is None or refresh.done():
+            refresh = self.__refresh_inflight = asyncio.create_task(
+                self.__refresh_access_token()
+            )
+
+        # the refresh task is shielded so that a cancelled caller only cancels
+        # its own wait, and not the refresh awaited by the other callers.
 
         try:
-            await self.__init_auth
+            await asyncio.shield(refresh)
+        finally:
+            if self.__refresh_inflight is refresh and refresh.done():
+                self.__refresh_inflight = None
+
+    async def gather(
+        self,
+        aws: Iterable[Awaitable],
+        batch_size: Optional[int] = None,
+        return_exceptions: Optional[bool] = False,
+    ) -> List:
+        """
+        This coroutine is used to execute a number of API calls, for example a
+        set of `get` coroutines, in batches so that at most `batch_size` are
+        submitted at a time rather than all at once.
 
-        except RuntimeError:
-            await self.refresh_token(self.__refresh_token)
+        Parameters
+        ----------
+        aws:
+            An iterable of awaitables, generally the API call coroutines.
 
-    async def refresh_token(self, token: Optional[str] = None):
-        """using the refresh token, obtain a new access token"""
+        batch_size: int
+            The number of awaitables to execute concurrently; if not provided
+            then the `batch_size` attribute value is used.
 
-        if token:
-            self.__refresh_token = token
+        return_exceptions: bool
+            Same as asyncio.gather
+
+        Returns
+        -------
+        List of results in the same order as the given awaitables.
+        """
+        batch_size = batch_size or self.batch_size
+        aws = iter(aws)
+        results = list()
 
-        assert self.__refresh_token is not None
-        await self.__refresh_access_token(self.__refresh_token)
-        self.headers["Authorization"] = f"Bearer {self.__access_token}"
+        try:
+            while batch := list(islice(aws, batch_size)):
+                tasks = [asyncio.ensure_future(aw) for aw in batch]
+                try:
+                    results.extend(
+                        await asyncio.gather(
+                            *tasks, return_exceptions=return_exceptions
+                        )
+                    )
+                finally:
+                    # if an awaitable fails, then the others in the batch are
+                    # cancelled, and their outcome retrieved so that they are
+                    # not reported as never retrieved.
+
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+        finally:
+            # the coroutines of any batches not yet started are closed so that
+            # they are not reported as never awaited.
+
+            for aw in aws:
+                if asyncio.iscoroutine(aw):
+                    aw.close()
+
+        return results
+
+    async def set_concurrency(self, limit: int):
+        """
+        This coroutine is used to change the number of concurrent requests
+        allowed.  Any requests waiting for admission are re-evaluated against
+        the new limit; in-flight requests are not affected.  The new limit
+        also becomes the upper bound for the automatic adjustments made in
+        response to 429 responses.
+
+        Parameters
+        ----------
+        limit: int
+            The maximum number of concurrent requests, must be >= 1.
+        """
+        if limit < 1:
+            raise ValueError(f"concurrency limit must be >= 1: {limit}")
+
+        async with self.__cond:
+            self.__cmax_limit = self.__cmax = limit
+            self.__success_streak = 0
+            self.__cond.notify_all()
 
     # -------------------------------------------------------------------------
     #
@@ -174,23 +434,74 @@ class IPFSession(AsyncClient):
     #
     # -------------------------------------------------------------------------
 
-    async def __refresh_access_token(self, refresh_token):
+    def __set_refresh_token(self, token: str):
+        """
+        Set the refresh token and the pre-encoded token refresh request body so
+        that the body is encoded once per token rather than once per refresh.
+        """
+        self.__refresh_token = token
+        self.__refresh_body = dumps({"refreshToken": token})
+
+    async def __refresh_access_token(self):
         """underlying API call to update the access token"""
-        res = await self.post(URIs.token_refresh, json={"refreshToken": refresh_token})
+        res = await self.post(TOKEN_REFRESH_URI, content=self.__refresh_body)
         res.raise_for_status()
-        body = res.json()
+        body = loads(res.content)
         self.__access_token = body["accessToken"]
+        self.__bearer = f"Bearer {self.__access_token}"
 
-    async def __auth_userpass(self, username, password):
+        # the Authorization header is installed once per refresh, by the
+        # single in-flight refresh task, rather than by each caller awaiting
+        # it.  The header is kept in the client headers since httpx merges
+        # those into every request regardless.
+
+        self.headers["Authorization"] = self.__bearer
+
+    async def __acquire(self):
+        """wait for, and then take, a request admission slot"""
+        async with self.__cond:
+            await self.__cond.wait_for(lambda: self.__active < self.__cmax)
+            self.__active += 1
+
+    async def __release(self, status_code: Optional[int]):
+        """
+        Release a request admission slot and adjust the concurrency limit
+        (additive-increase, multiplicative-decrease) based on the response
+        status code.  The status_code is None if the request did not complete.
+        """
+        async with self.__cond:
+            self.__active -= 1
+
+            if status_code == 429:
+                self.__success_streak = 0
+                self.__cmax = max(1, self.__cmax // 2)
+
+            elif status_code is not None and 200 <= status_code < 300:
+                self.__success_streak += 1
+                if (
+                    self.__success_streak >= self.API_THROTTLE_RAMP
+                    and self.__cmax < self.__cmax_limit
+                ):
+                    self.__success_streak = 0
+                    self.__cmax += 1
+                    self.__cond.notify_all()
+                    return
+
+            self.__cond.notify(1)
+
+    async def __auth_api_token(self):
+        """the API Token is sent in every request header, nothing to do"""
+
+    async def __auth_userpass(self):
         """underlying API to call to authenticate using login credentials"""
-        res = await self.post(
-            URIs.login, json={"username": username, "password": password}
-        )
+        res = await self.post(LOGIN_URI, content=self.__login_body)
         res.raise_for_status()
-        body = res.json()
+        body = loads(res.content)
         self.__access_token = body["accessToken"]
-        self.__refresh_token = body["refreshToken"]
-        self.headers["Authorization"] = f"Bearer {self.__access_token}"
+        self.__bearer = f"Bearer {self.__access_token}"
+        self.__set_refresh_token(body["refreshToken"])
+        self.headers["Authorization"] = self.__bearer
+        self.__authenticate = self.refresh_token
 
     # -------------------------------------------------------------------------
     #
@@ -198,14 +509,72 @@ class IPFSession(AsyncClient):
     #
     # -------------------------------------------------------------------------
 
+    async def __aenter__(self):
+        """open the client connection pool and authenticate"""
+        await super().__aenter__()
+
+        # __aexit__ is not called when __aenter__ fails, so the connection pool
+        # is closed here if the authentication fails.
+
+        try:
+            await self.authenticate()
+        except Exception:
+            await self.aclose()
+            raise
+
+        return self
+
     async def request(self, *vargs, **kwargs):
-        async with self.__sema4:
+        """
+        Send the request, retrying with an exponential backoff (API_RETRY_*)
+        when the IPF system responds with a 429 (Too Many Requests).  If all
+        attempts are exhausted then the 429 response is returned.
+        """
+
+        # each attempt acquires an admission slot that is released before any
+        # retry backoff sleep so that a request waiting to retry a 429 does not
+        # hold a slot that could be used by other requests.
+
+        delay = self.API_RETRY_MIN_WAIT
+        last_attempt = self.API_RETRY_ATTEMPTS - 1
+
+        for attempt in range(self.API_RETRY_ATTEMPTS):
+            await self.__acquire()
+            status_code = None
+            try:
+                if self.__rate_limiter:
+                    await self.__rate_limiter.acquire()
 
-            @retry(wait=wait_exponential(multiplier=1, min=4, max=10))
-            async def _do_rqst():
-                res = await super(IPFSession, self).request(*vargs, **kwargs)
-                if res.status_code == 429:
-                    res.raise_for_status()
+                res = await super().request(*vargs, **kwargs)
+                status_code = res.status_code
+            finally:
+                await self.__release(status_code)
+
+            if status_code != 429 or attempt == last_attempt:
                 return res
 
-            return await _do_rqst()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.API_RETRY_MAX_WAIT)
+
+    @asynccontextmanager
+    async def stream(self, *vargs, **kwargs):
+        """
+        Stream the response subject to the same concurrency and rate limits as
+        `request`.  The admission slot is released once the response headers
+        are received, rather than when the Caller is done with the body, so
+        that the Caller can make other API calls while consuming the body.  A
+        429 response is not retried since the Caller consumes the response.
+        """
+        await self.__acquire()
+        released = False
+        try:
+            if self.__rate_limiter:
+                await self.__rate_limiter.acquire()
+
+            async with super().stream(*vargs, **kwargs) as res:
+                await self.__release(res.status_code)
+                released = True
+                yield res
+        finally:
+            if not released:
+                await self.__release(None)
@@ -18,9 +18,13 @@ import http
 # System Imports
 # -----------------------------------------------------------------------------
 
-from typing import Optional, AnyStr, Iterable, List, Dict, Union
-from os import environ, getenv
-from dataclasses import dataclass
+from typing import Optional, AnyStr, Iterable, List, Dict, Union, Final
+from typing import AsyncIterator
+from os import environ
+from functools import lru_cache
+from collections import OrderedDict
+import asyncio
+import logging
 
 # -----------------------------------------------------------------------------
 # Public Imports
@@ -33,8 +37,9 @@ from httpx import Response
 # -----------------------------------------------------------------------------
 
 from .api import IPFSession
-from .filters import parse_filter
-from .table_api import table_api
+from .filters import parse_filter, compile_filter, make_filter
+from .table_api import table_api, table_request
+from .jsonlib import loads, dumps, aiter_items
 
 # -----------------------------------------------------------------------------
 # Exports
@@ -50,11 +55,31 @@ __all__ = ["IPFBaseClient", "table_api"]
 # -----------------------------------------------------------------------------
 
 
-@dataclass
-class URIs:
-    """identifies API URL endpoings used"""
+# API URL endpoints used
 
-    snapshots = "/snapshots"
+SNAPSHOTS_URI: Final = "/snapshots"
+OS_VERSION_URI: Final = "/os/version"
+
+_LOG = logging.getLogger(__package__)
+
+
+@lru_cache(maxsize=None)
+def _env(name: str) -> Optional[str]:
+    """returns the cached value of the environment variable, or None"""
+    return environ.get(name)
+
+
+# The API version path discovered by `discover_api_version`, keyed by the IPF
+# system URL, so that other clients of the same system in this process do not
+# need to repeat the discovery request.
+
+_API_VERSION_PATHS: Dict[str, str] = dict()
+
+# The classes composed by the `mixin` method, keyed by the tuple of the base
+# class and mixin classes, so that clients using the same set of mixins share
+# the same class object.
+
+_COMPOSITE_CACHE: Dict[tuple, type] = {}
 
 
 class IPFBaseClient(object):
@@ -68,7 +93,6 @@ class IPFBaseClient(object):
     instance).
     """
 
-    @dataclass
     class ENV:
         """identifies enviornment variables used"""
 
@@ -77,6 +101,34 @@ class IPFBaseClient(object):
         password = "IPF_PASSWORD"
         token = "IPF_TOKEN"
 
+    # the instance attributes are declared as slots.  The "__dict__" and
+    # "__weakref__" slots are included so that the subclasses, which do not
+    # declare slots, have the same layout; as required for `mixin` to assign
+    # the instance class.  The instance dict is only created if an attribute
+    # other than these is set, for example the IPFDiagramPathMixin `svg`
+    # option.
+
+    __slots__ = (
+        "api",
+        "_clientopts",
+        "_http_cache",
+        "_table_cache",
+        "_table_cache_maxsize",
+        "snapshots",
+        "_snapshot_by_name",
+        "_snapshot_by_id",
+        "_snapshots_loaded",
+        "_active_snapshot",
+        "version",
+        "__dict__",
+        "__weakref__",
+    )
+
+    # the maximum number of table responses retained by `fetch_table`; by
+    # default the responses are not cached.
+
+    TABLE_CACHE_MAXSIZE = 0
+
     def __init__(
         self,
         /,
@@ -109,7 +161,15 @@ class IPFBaseClient(object):
         Other Parameters
         ----------------
         `clientopts` are passed AS-IS to the API session so that the
-        httpx.AsyncClient can be configured as desired.
+        httpx.AsyncClient can be configured as desired.  For example, HTTP/2
+        is used by default when the h2 package is installed (as it is with
+        the httpx[http2] dependency), and can be disabled using `http2=False`.
+        Refer to IPFSession for the additional options it supports.
+
+        The `clientopts` may also include an optional key `TABLE_CACHE_MAXSIZE`
+        that enables the `fetch_table` response cache, retaining at most that
+        number of table responses.  By default the responses are not cached
+        since a table response can be large.
 
         Notes
         -----
@@ -117,10 +177,16 @@ class IPFBaseClient(object):
         or the refresh token.  One of these two are required.
         """
 
-        token = token or getenv(self.ENV.token)
-        base_url = base_url or environ[self.ENV.addr]
-        username = username or getenv(self.ENV.username)
-        password = password or getenv(self.ENV.password)
+        token = token or _env(self.ENV.token)
+        username = username or _env(self.ENV.username)
+        password = password or _env(self.ENV.password)
+
+        if not (base_url := base_url or _env(self.ENV.addr)):
+            raise KeyError(self.ENV.addr)
+
+        self._table_cache_maxsize = (
+            clientopts.pop("TABLE_CACHE_MAXSIZE", None) or self.TABLE_CACHE_MAXSIZE
+        )
 
         # if the Caller does not provide a base_url that has the '/api/v'
         # substring then use the default API version for the class.
@@ -133,6 +199,21 @@ class IPFBaseClient(object):
             **clientopts,
         )
 
+        # retain the client options so that they are used if the API session
+        # is re-created on a subsequent login.
+
+        self._clientopts = clientopts
+
+        # cache of GET responses, keyed by URL, used for conditional requests;
+        # see `_cached_get`.
+
+        self._http_cache: Dict[str, tuple] = dict()
+
+        # LRU cache of table responses, keyed by URL and request body, which
+        # includes the snapshot; see `fetch_table`.
+
+        self._table_cache: OrderedDict = OrderedDict()
+
         # dynamically add any Mixins at the time of client creation.  This
         # enables the caller to perform the mixin at runtime without having to
         # define a specific class.
@@ -141,21 +222,41 @@ class IPFBaseClient(object):
             self.mixin(*mixin_classes)
 
         self.snapshots = None
+        self._snapshot_by_name: Dict[str, str] = dict()
+        self._snapshot_by_id: Dict[str, dict] = dict()
+        self._snapshots_loaded: List[str] = list()
         self._active_snapshot = None
         self.version = None  # the IPF product version
 
+    @staticmethod
+    def reload_env():
+        """discard the cached environment variable values, see `ENV`"""
+        _env.cache_clear()
+
     @property
     def active_snapshot(self):
         return self._active_snapshot
 
     @active_snapshot.setter
     def active_snapshot(self, name):
-        if (
-            s_id := next((i["id"] for i in self.snapshots if i["name"] == name), None)
-        ) is None:
+        if (s_id := self._snapshot_by_name.get(name)) is None:
             raise ValueError(name)
+
         self._active_snapshot = s_id
 
+    @property
+    def snapshots_by_id(self) -> Dict[str, dict]:
+        """
+        The snapshot records keyed by snapshot ID, for example to obtain the
+        record of the active snapshot:
+
+            ipf.snapshots_by_id[ipf.active_snapshot]
+
+        The index is built when the snapshots are fetched and should not be
+        modified by the Caller.
+        """
+        return self._snapshot_by_id
+
     async def discover_api_version(self):
         """
         If the '/api/v' substring is to provided by the Caller then this
@@ -164,15 +265,22 @@ class IPFBaseClient(object):
         authentication to acceess. if that endpoint exists, then use the
         version in the response payload to form the basse URL.  If then
         endpoint does not exist (404) then using a version of IPF < v5.
+
+        The discovered version is retained for the duration of the process,
+        and used by any other client of the same IPF system.
         """
+        base_url = str(self.api.base_url)
 
-        res = await self.api.get("/api/version")
+        if (api_path := _API_VERSION_PATHS.get(base_url)) is None:
+            res = await self.api.get("/api/version")
 
-        self.api.base_url = self.api.base_url.join(
-            "/api/v1/"
-            if res.status_code == http.HTTPStatus.NOT_FOUND
-            else f"/api/{res.json()['apiVersion']}"
-        )
+            api_path = _API_VERSION_PATHS[base_url] = (
+                "/api/v1/"
+                if res.status_code == http.HTTPStatus.NOT_FOUND
+                else f"/api/{loads(res.content)['apiVersion']}"
+            )
+
+        self.api.base_url = self.api.base_url.join(api_path)
 
     async def login(self):
         """
@@ -184,10 +292,21 @@ class IPFBaseClient(object):
         if "/api/v" not in str(self.api.base_url):
             await self.discover_api_version()
 
-        if self.api.token and self.api.is_closed:
-            self.api = IPFSession(base_url=str(self.api.base_url), token=self.api.token)
+        # if the API session was closed by a prior logout, then re-create it
+        # using the prior token.  An API token is used as-is, and does not
+        # require an authentication request; otherwise the token is the
+        # refresh token from the prior login.
+
+        if self.api.is_closed and (token := self.api.token):
+            token_opt = "refresh_token" if self.api.refresh_required else "token"
+            self.api = IPFSession(
+                base_url=self.api.base_url,
+                **{token_opt: token},
+                **self._clientopts,
+            )
 
-        await self.api.authenticate()
+        if self.api.refresh_required:
+            await self.api.authenticate()
 
         # if the `version` attribute is set this means that this client has
         # connected to the IPF system before, and we do not need to re-fetch the
@@ -196,40 +315,123 @@ class IPFBaseClient(object):
         if self.version:
             return
 
-        # capture the IPF version value
-        res = await self.api.get("/os/version")
-        res.raise_for_status()
-        self.version = res.json()["version"]
-
-        # fetch the snapshot catalog and default the active to the most recent one.
+        # fetch the snapshot catalog concurrently with the IPF version value,
+        # and default the active to the most recent one.
         # TODO: might want to only fetch the "latest" snapshot vs. all.
-        await self.fetch_snapshots()
-        self._active_snapshot = next(
-            (
-                snapshot["id"]
-                for snapshot in self.snapshots
-                if snapshot["state"] == "loaded"
-            ),
-            None,
+
+        snapshots_task = asyncio.create_task(self.fetch_snapshots())
+
+        try:
+            os_version = await self._cached_get(OS_VERSION_URI)
+        except BaseException:
+            # the snapshot fetch is cancelled and awaited so that it does not
+            # outlive the failed login.
+
+            snapshots_task.cancel()
+            await asyncio.gather(snapshots_task, return_exceptions=True)
+            raise
+
+        await snapshots_task
+        self.version = os_version["version"]
+        self._active_snapshot = (
+            self._snapshots_loaded[0] if self._snapshots_loaded else None
         )
 
     async def logout(self):
         """close the async connection"""
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Close the API session so that the keep-alive connection pool is shut
+        down on the same event loop that it was created on.
+        """
         await self.api.aclose()
 
     async def fetch_snapshots(self) -> None:
         """coroutine to retrieve all known snapshots, returns List[dict] records"""
-        res = await self.api.get(URIs.snapshots)
+        snapshots = await self._cached_get(SNAPSHOTS_URI)
+
+        # the lookup indexes only need to be rebuilt when the catalog changes,
+        # that is, not when the cached body is returned on a 304 response.
+
+        if snapshots is not self.snapshots:
+            self._snapshot_by_name = {s["name"]: s["id"] for s in snapshots}
+            self._snapshot_by_id = {s["id"]: s for s in snapshots}
+            self._snapshots_loaded = [
+                s["id"] for s in snapshots if s["state"] == "loaded"
+            ]
+            self.snapshots = snapshots
+
+    def clear_table_cache(self):
+        """discard the table responses cached by `fetch_table`"""
+        self._table_cache.clear()
+
+    def clear_http_cache(self):
+        """discard the responses cached for conditional GET requests"""
+        self._http_cache.clear()
+
+    async def _cached_get(self, url: str):
+        """
+        This coroutine is used to GET the JSON body of the given `url` using a
+        conditional request when a prior response included an ETag or
+        Last-Modified header.  If the IPF system responds 304 (Not Modified)
+        then the previously decoded body is returned without transferring or
+        decoding the body again.
+
+        Parameters
+        ----------
+        url: str
+            The API URL
+
+        Returns
+        -------
+        The decoded response body
+        """
+        headers = dict()
+
+        if cached := self._http_cache.get(url):
+            etag, last_modified, body = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        res = await self.api.get(url, headers=headers)
+
+        if cached and res.status_code == http.HTTPStatus.NOT_MODIFIED:
+            _LOG.debug(f"X-Cache: HIT {url}")
+            return cached[2]
+
+        _LOG.debug(f"X-Cache: MISS {url}")
         res.raise_for_status()
-        self.snapshots = res.json()
+        body = loads(res.content)
+
+        etag = res.headers.get("ETag")
+        last_modified = res.headers.get("Last-Modified")
+
+        if etag or last_modified:
+            self._http_cache[url] = (etag, last_modified, body)
+        else:
+            self._http_cache.pop(url, None)
+
+        return body
 
     @table_api
-    async def fetch_table(self, url: str, request: dict) -> Union[Response, List, Dict]:
+    async def fetch_table(
+        self, url: str, request: dict, no_cache: bool = False
+    ) -> Union[Response, List, Dict]:
         """
         This coroutine is used to fetch records from any table, as identified by
         the `url` parameter.  The `requests` dict *must* contain a columns key,
         and if missing this coroutine will raise a ValueError exception.
 
+        When enabled, by the `TABLE_CACHE_MAXSIZE` option, successful
+        responses are retained in an LRU cache, keyed by the `url` and
+        `request` body, so that repeating the same table request does not
+        query the IPF system again.  The response body is decoded for each
+        call, and so the Caller may modify the returned records.
+
         Parameters
         ----------
         url: str
@@ -238,8 +440,66 @@ class IPFBaseClient(object):
         request: dict
             The request body payload, as prepared by the `table_api` decorator.
 
+        no_cache: bool
+            When True the IPF system is queried even if the response is cached.
+        """
+        # the encoded request body is used both as part of the cache key and
+        # as the request content, so that it is only encoded once.
+
+        content = dumps(request)
+        key = (url, content)
+
+        if not self._table_cache_maxsize:
+            return await self.api.post(url=url, content=content)
+
+        if not no_cache and (res := self._table_cache.get(key)) is not None:
+            self._table_cache.move_to_end(key)
+            return res
+
+        res = await self.api.post(url=url, content=content)
+
+        if res.is_success:
+            self._table_cache[key] = res
+            self._table_cache.move_to_end(key)
+            if len(self._table_cache) > self._table_cache_maxsize:
+                self._table_cache.popitem(last=False)
+
+        return res
+
+    async def fetch_table_iter(
+        self, url: str, *, request: Optional[dict] = None, **table_params
+    ) -> AsyncIterator[dict]:
         """
-        return await self.api.post(url=url, json=request)
+        This async generator is used to fetch records from any table, as
+        identified by the `url` parameter, yielding each record as it is
+        decoded from the streamed response body.  Unlike `fetch_table`, the
+        complete response body is not held in memory along with the decoded
+        records; which is useful for large tables.  The records are decoded
+        incrementally when the ijson package is installed.
+
+        Parameters
+        ----------
+        url: str
+            The URL to indicate the table, for example "/tables/inventory/devices".
+
+        request: dict
+            The optional starting request body
+
+        Other Parameters
+        ----------------
+        The table parameters, such as `filters` and `columns`, as described in
+        the `table_api` decorator.
+
+        Yields
+        ------
+        dict - each table record
+        """
+        payload = table_request(self.active_snapshot, request=request, **table_params)
+
+        async with self.api.stream("POST", url, content=dumps(payload)) as res:
+            res.raise_for_status()
+            async for record in aiter_items(res.aiter_bytes()):
+                yield record
 
     def mixin(self, *mixin_cls):
         """
@@ -256,7 +516,18 @@ class IPFBaseClient(object):
         ----------
         https://stackoverflow.com/questions/8544983/dynamically-mixin-a-base-class-to-an-instance-in-python
         """
-        self.__class__ = type(self.__class__.__name__, (self.__class__, *mixin_cls), {})
+        # skip any mixin classes that are already composed into this instance
+        # so that repeated calls do not create a new class.
+
+        mixin_cls = tuple(m for m in mixin_cls if not isinstance(self, m))
+        if not mixin_cls:
+            return
+
+        key = (self.__class__, *mixin_cls)
+        if (cls := _COMPOSITE_CACHE.get(key)) is None:
+            cls = _COMPOSITE_CACHE[key] = type(self.__class__.__name__, key, {})
+
+        self.__class__ = cls
 
     def __repr__(self) -> Iterable[str]:
         """override the default repr to show the IPF system base URL"""
@@ -286,3 +557,5 @@ class IPFBaseClient(object):
     # -------------------------------------------------------------------------
 
     parse_filter = staticmethod(parse_filter)
+    compile_filter = staticmethod(compile_filter)
+    make_filter = staticmethod(make_filter)
@@ -13,7 +13,8 @@
 #  limitations under the License.
 #
 
-from typing import List, Dict, Optional, AnyStr
+from typing import List, Dict, Optional, AnyStr, Callable
+from operator import itemgetter
 import csv
 
 # -----------------------------------------------------------------------------
@@ -36,6 +37,30 @@ __all__ = ["IPFabricClient"]
 # -----------------------------------------------------------------------------
 
 
+def _csv_row_getter(fieldnames: List[str]) -> Callable[[Dict], tuple]:
+    """
+    returns a function that returns the tuple of the record values for the
+    given fieldnames, used to write the CSV rows with csv.writer rather than
+    csv.DictWriter, which looks up each fieldname of each record in Python.
+    As with the DictWriter default, a field missing from a record is written
+    as an empty value.
+    """
+    if len(fieldnames) == 1:
+        # itemgetter with a single item returns the value, not a tuple.
+        (field,) = fieldnames
+        getter = lambda rec: (rec[field],)
+    else:
+        getter = itemgetter(*fieldnames)
+
+    def get_row(rec: Dict) -> tuple:
+        try:
+            return getter(rec)
+        except KeyError:
+            return tuple(rec.get(field, "") for field in fieldnames)
+
+    return get_row
+
+
 class IPFabricClient(IPFInventoryMixin):
     """
     An instance IPFabricClient is used to interact with the IP Fabric
@@ -82,23 +107,79 @@ class IPFabricClient(IPFInventoryMixin):
         dl_fieldnames = datalist[0].keys()
 
         if fieldnames:
-            _s_fieldnames = set(fieldnames)
-            _s_dl_fieldnames = set(dl_fieldnames)
-
-            if _s_fieldnames & _s_dl_fieldnames != _s_fieldnames:
+            if not set(fieldnames) <= dl_fieldnames:
                 raise RuntimeError(f"Invalid set of fieldnames: {fieldnames}")
 
-            exclude = _s_dl_fieldnames - _s_fieldnames
+            fieldnames = list(fieldnames)
         else:
-            fieldnames = dl_fieldnames
+            fieldnames = list(dl_fieldnames)
 
         if exclude:
             fieldnames = [col for col in fieldnames if col not in exclude]
-            for rec in datalist:
-                for key in exclude:
-                    del rec[key]
-
-        with open(filepath, "w+") as ofile:
-            csv_wr = csv.DictWriter(ofile, fieldnames=fieldnames)
-            csv_wr.writeheader()
-            csv_wr.writerows(datalist)
+
+        # only the fieldnames values are written, so that the excluded fields
+        # are omitted without deleting them from the Caller's records.
+
+        get_row = _csv_row_getter(fieldnames)
+
+        with open(filepath, "w+", newline="", buffering=1 << 20) as ofile:
+            csv_wr = csv.writer(ofile)
+            csv_wr.writerow(fieldnames)
+            csv_wr.writerows(map(get_row, datalist))
+
+    async def fetch_table_csv(
+        self,
+        url: str,
+        filepath: AnyStr,
+        *,
+        columns: List[str],
+        exclude: Optional[List[str]] = None,
+        **table_params,
+    ) -> int:
+        """
+        This coroutine will store the records of the table, as identified by
+        the `url` parameter, to a CSV file.  The records are written as they
+        are received, see `fetch_table_iter`, rather than first fetching the
+        complete list of records as would be used with `to_csv`; which is
+        useful for large tables.
+
+        Parameters
+        ----------
+        url: str
+            The URL to indicate the table, for example "/tables/inventory/devices".
+
+        filepath: str
+            The CSV file path
+
+        columns: list
+            The list of table columns; these are also the CSV column headers
+            less any in the `exclude` list.
+
+        exclude: list
+            The optional list of columns to omit from the CSV file
+
+        Other Parameters
+        ----------------
+        The other table parameters, such as `filters`, as described in the
+        `table_api` decorator.
+
+        Returns
+        -------
+        The number of records written to the CSV file.
+        """
+        fieldnames = [col for col in columns if col not in (exclude or ())]
+        count = 0
+
+        get_row = _csv_row_getter(fieldnames)
+
+        with open(filepath, "w+", newline="", buffering=1 << 20) as ofile:
+            csv_wr = csv.writer(ofile)
+            csv_wr.writerow(fieldnames)
+
+            async for rec in self.fetch_table_iter(
+                url, columns=columns, **table_params
+            ):
+                csv_wr.writerow(get_row(rec))
+                count += 1
+
+        return count
@@ -13,7 +13,7 @@
 #  limitations under the License.
 #
 
-"""
+r"""
 This file contains API helpers for filtering data.  At the time of v3.6, the
 online documentation can be found here:
 https://docs.ipfabric.io/api/#header-filter-structure.  Unfortunately the
@@ -40,14 +40,40 @@ Nested Group Expressions:
     )
 
 
+Grammar
+-------
+The filter expressions are parsed by a recursive-descent parser for the
+following PEG grammar; each alternative (/) is tried in the order given.
+
+    filter_expr         = group_expr / simple_expr
+    group_expr          = group_tok ws "(" ws group_list_expr ws ")"
+    group_list_item     = group_expr / simple_expr
+    group_list_expr     = group_list_item (ws "," ws group_list_item)+
+
+    simple_expr         = col_name ws (column_expr_rhs / color_expr_rhs / oper_expr_rhs)
+    num_oper_expr_rhs   = (num_oper / ei_oper) ws int_tok
+    str_oper_expr_rhs   = (str_oper / ei_oper) ws cmp_value_tok
+    oper_expr_rhs       = (num_oper_expr_rhs / str_oper_expr_rhs)
+    column_expr_rhs     = "column" ws ei_oper ws col_name
+    color_expr_rhs      = "color" ws num_oper_expr_rhs
+
+    col_name            = ~"[a-z0-9_\-]+"i
+    word                = ~"[\\a-z0-9\.\/_\-]+"i
+    int_tok             = ~"\d+"
+    ws                  = ~"\s*"
+    group_tok           = "and" / "or"
+    str_oper            = "!=~" / "=~" / "net" / "!~" / "~" / "?"
+    num_oper            = "<=" / ">=" / "<" / ">"
+    ei_oper             = "!=" / "="
+    cmp_value_tok       = sq_tok / dq_tok / word
+    sq_tok              = "'" ~"[^']+" "'"
+    dq_tok              = '"' ~'[^"]+' '"'
+
 References
 ----------
     IP Fabric API docs:
     https://docs.ipfabric.io/api/#header-filter-structure.
 
-    Parsimonious:
-    https://github.com/erikrose/parsimonious
-
 Notes
 -----
 Filter options for <string> type
@@ -91,21 +117,17 @@ Filter options for <number> type
 # System Imports
 # -----------------------------------------------------------------------------
 
-from types import MappingProxyType
-from itertools import chain
-
-# -----------------------------------------------------------------------------
-# Public Imports
-# -----------------------------------------------------------------------------
-
-from parsimonious import Grammar, NodeVisitor
-from parsimonious.nodes import RegexNode
+from typing import Optional, Tuple, Dict, Any, Callable
+from functools import lru_cache
+from string import Formatter
+import sys
+import re
 
 # -----------------------------------------------------------------------------
 # Exports
 # -----------------------------------------------------------------------------
 
-__all__ = ["parse_filter"]
+__all__ = ["parse_filter", "compile_filter", "make_filter"]
 
 # -----------------------------------------------------------------------------
 #
@@ -113,191 +135,480 @@ __all__ = ["parse_filter"]
 #
 # -----------------------------------------------------------------------------
 
-_OPERATORS = MappingProxyType(
-    {
-        "=": "eq",  # equals exactly
-        "!=": "neq",  # does not equal
-        "~": "like",  # string contains
-        "!~": "notlike",  # string does not contain
-        "=~": "reg",  # match regular expression
-        "!=~": "nreg",  # does not match regular expression
-        "?": "empty",  # column is empty, provided rhs-value is either "true" or "false"
-        "net": "cidr",  # value match using IP CIDR value
-        "<": "lt",  # less than
-        "<=": "lte",  # less than or equal to
-        ">": "gt",  # greater than
-        ">=": "gte",  # greather than or equal to
-    }
+_OPERATORS = {
+    "=": "eq",  # equals exactly
+    "!=": "neq",  # does not equal
+    "~": "like",  # string contains
+    "!~": "notlike",  # string does not contain
+    "=~": "reg",  # match regular expression
+    "!=~": "nreg",  # does not match regular expression
+    "?": "empty",  # column is empty, provided rhs-value is either "true" or "false"
+    "net": "cidr",  # value match using IP CIDR value
+    "<": "lt",  # less than
+    "<=": "lte",  # less than or equal to
+    ">": "gt",  # greater than
+    ">=": "gte",  # greather than or equal to
+}
+
+
+# the grammar tokens, in the order that the alternatives are tried.
+
+_GROUP_TOKS = ("and", "or")
+_STR_OPERS = ("!=~", "=~", "net", "!~", "~", "?")
+_NUM_OPERS = ("<=", ">=", "<", ">")
+_EI_OPERS = ("!=", "=")
+
+_COL_NAME = re.compile(r"[a-z0-9_\-]+", re.IGNORECASE)
+_WORD = re.compile(r"[\\a-z0-9./_\-]+", re.IGNORECASE)
+_INT_TOK = re.compile(r"\d+")
+_SQ_TOK = re.compile(r"'([^']+)'")
+_DQ_TOK = re.compile(r'"([^"]+)"')
+_QUOTED_TOKS = {"'": _SQ_TOK, '"': _DQ_TOK}
+
+# a simple_expr with a numeric or string comparison, matched in one step.  The
+# column name is not backtracked, as in the parser, and values starting with a
+# digit for the "=" and "!=" operators are left to the parser since these are
+# int_tok values.  The operators are case-sensitive, as in the grammar.
+
+_SIMPLE_EXPR = re.compile(
+    r"""([a-z0-9_\-]+)(?![a-z0-9_\-])\s*(?:
+        ([<>]=?)\s*(\d+)
+        | (?-i:(!=~|=~|!~|~|!=|=|net))\s*(?:'([^']+)'|"([^"]+)"|([\\a-z0-9./_\-]+))
+    )""",
+    re.IGNORECASE | re.VERBOSE,
 )
 
 
-FILTER_GRAMMER = r"""
-#
-# Expression parts
-#
-filter_expr         = group_expr / simple_expr
-group_expr          = group_tok ws "(" ws group_list_expr ws ")"
-group_list_item     = group_expr / simple_expr
-group_list_expr     = group_list_item ws ("," ws group_list_item)+
-#
-#
-simple_expr         = col_name ws (column_expr_rhs / color_expr_rhs / oper_expr_rhs)
-num_oper_expr_rhs   = (num_oper / ei_oper) ws int_tok
-str_oper_expr_rhs   = (str_oper / ei_oper) ws cmp_value_tok
-oper_expr_rhs       = (num_oper_expr_rhs / str_oper_expr_rhs)
-column_expr_rhs     = "column" ws ei_oper ws col_name
-color_expr_rhs      = "color" ws num_oper_expr_rhs
-#
-# Token parts
-#
-col_name        = ~"[a-z0-9_\-]+"i
-sq_words        = ~"[^']+"
-dq_words        = ~"[^\"]+"
-ws              = ~"\s*"
-sq              = "'"
-dq              = "\""
-word            = ~r"[\\a-z0-9\.\/_\-]+"i
-int_tok         = ~"\d+"
-group_tok       = 'and' / 'or'
-str_oper        = '!=~' / '=~' / 'net' / '!~' / '~' / '?'
-num_oper        =  '<=' / '>=' / '<' / '>'
-ei_oper         = '!=' / '='
-cmp_value_tok   = sq_tok / dq_tok / word
-sq_tok          = sq sq_words sq
-dq_tok          = dq dq_words dq
-"""
+def _opers_by_first_char(*opers: str) -> Dict[str, Tuple[str, ...]]:
+    """
+    returns the operators keyed by their first character, each retaining the
+    order of the alternatives, so that only the operators that can match at
+    a position are tried.
+    """
+    table: Dict[str, Tuple[str, ...]] = dict()
+    for oper in opers:
+        table[oper[0]] = (*table.get(oper[0], ()), oper)
+    return table
+
+
+# (num_oper / ei_oper), (str_oper / ei_oper), and ei_oper
+
+_NUM_RHS_OPERS = _opers_by_first_char(*_NUM_OPERS, *_EI_OPERS)
+_STR_RHS_OPERS = _opers_by_first_char(*_STR_OPERS, *_EI_OPERS)
+_EI_RHS_OPERS = _opers_by_first_char(*_EI_OPERS)
+
+_EMPTY_VALUES = {"true": True, "false": False}
+
+# Each of the parse functions is given the expression text and the position at
+# which to start, and returns a tuple of the parsed value and the position
+# following it; or None if the text at that position does not match.
+
+_Parsed = Optional[Tuple[Any, int]]
+
+
+def _ws(text: str, pos: int) -> int:
+    """returns the position following any whitespace"""
+    end = len(text)
+    while pos < end and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _parse_oper(text: str, pos: int, opers: Dict[str, Tuple[str, ...]]) -> _Parsed:
+    """returns the IPF API form of the first matching operator"""
+    for oper in opers.get(text[pos : pos + 1], ()):
+        if text.startswith(oper, pos):
+            return _OPERATORS[oper], pos + len(oper)
+
+    return None
+
+
+def _parse_regex(text: str, pos: int, regex: re.Pattern) -> _Parsed:
+    """returns the text matching the token regular expression"""
+    if (found := regex.match(text, pos)) is None:
+        return None
+
+    return found.group(), found.end()
+
+
+def _parse_expr(text: str, pos: int) -> _Parsed:
+    """filter_expr = group_expr / simple_expr"""
+    return _parse_group(text, pos) or _parse_simple(text, pos)
+
+
+def _parse_group(text: str, pos: int) -> _Parsed:
+    """group_expr = group_tok ws "(" ws group_list_expr ws ")" """
+    for group_tok in _GROUP_TOKS:
+        if text.startswith(group_tok, pos):
+            break
+    else:
+        return None
+
+    pos = _ws(text, pos + len(group_tok))
+    if not text.startswith("(", pos):
+        return None
+
+    if (parsed := _parse_expr(text, _ws(text, pos + 1))) is None:
+        return None
+
+    item, pos = parsed
+    items = [item]
+
+    while text.startswith(",", next_pos := _ws(text, pos)):
+        if (parsed := _parse_expr(text, _ws(text, next_pos + 1))) is None:
+            break
+        item, pos = parsed
+        items.append(item)
+
+    # a group must contain at least two items.
+
+    if len(items) < 2:
+        return None
+
+    pos = _ws(text, pos)
+    if not text.startswith(")", pos):
+        return None
+
+    return {group_tok: items}, pos + 1
+
+
+def _match_simple(text: str, pos: int) -> _Parsed:
+    """
+    returns the simple_expr matched by the _SIMPLE_EXPR regular expression, or
+    None if the expression must be parsed by the grammar rules.
+    """
+    if (found := _SIMPLE_EXPR.match(text, pos)) is None:
+        return None
+
+    col, num_oper, num, str_oper, sq, dq, word = found.groups()
+
+    if num_oper:
+        return {sys.intern(col): [_OPERATORS[num_oper], int(num)]}, found.end()
+
+    if word is not None:
+        if word[0].isdigit() and str_oper in _EI_OPERS:
+            return None
+        value = word
+    else:
+        value = sq if sq is not None else dq
 
-# prior-DEPRECIATED, but here for reference just in case.
-# word            = ~r"[a-z0-9\.\/_\-]+"i
-# group_expr_list     = group_expr ws ("," ws group_expr)+
-# expr_list           = group_expr / simple_expr_list
-# group_expr_list     = group_expr ws ("," ws expr_list)+
-# simple_expr_list    = simple_expr ws ("," ws simple_expr)+
+    return {sys.intern(col): [_OPERATORS[str_oper], value]}, found.end()
 
 
-_grammer = Grammar(FILTER_GRAMMER)
+def _parse_simple(text: str, pos: int) -> _Parsed:
+    """
+    simple_expr = col_name ws (column_expr_rhs / color_expr_rhs / oper_expr_rhs)
+    """
+    # most simple expressions are a comparison that is matched in one step.
+
+    if (parsed := _match_simple(text, pos)) is not None:
+        return parsed
+
+    if (parsed := _parse_regex(text, pos, _COL_NAME)) is None:
+        return None
 
+    # the column names are interned since the same few names are used by
+    # all of the filters, and are then hashed as the dictionary keys.
+
+    col, pos = parsed
+    col = sys.intern(col)
+    pos = _ws(text, pos)
+
+    parsed = (
+        _parse_column_rhs(text, pos)
+        or _parse_color_rhs(text, pos)
+        or _parse_num_rhs(text, pos)
+        or _parse_str_rhs(text, pos)
+    )
 
-class _FilterConstructor(NodeVisitor):
-    """parsimouneous node visitor for handlingn the FILTER_GRAMMER"""
+    if parsed is None:
+        return None
 
-    def visit_group_expr(self, node, vc):  # noqa
-        """create a group_expr item"""
-        group_tok, _, _, _, filter_list, *_ = vc
-        return {group_tok: filter_list}
+    rhs, pos = parsed
 
-    def visit_group_list_expr(self, node, vc):  # noqa
-        """create a list of group_expr items"""
-        expr_1, _, expr_n = vc
-        expr_list = [
-            expr_1,
-            *(expr for expr in chain.from_iterable(expr_n) if isinstance(expr, dict)),
-        ]
-        return expr_list
+    if rhs[0] == "empty":
+        if (value := _EMPTY_VALUES.get(rhs[1].lower())) is None:
+            raise RuntimeError("'empty' value must be either 'true' or 'false'")
+        rhs[1] = value
 
-    def visit_group_list_item(self, node, vc):  # noqa
-        return vc[0]
+    return {col: rhs}, pos
 
-    def visit_simple_expr(self, node, vc):  # noqa
-        """return a filter dictionary"""
-        col, rhs = vc[0], vc[2][0]
 
-        if rhs[0] == "empty":
-            val = rhs[1]
-            if (val := {"true": True, "false": False}.get(val.lower())) is None:
-                raise RuntimeError("'empty' value must be either 'true' or 'false'")
-            rhs[1] = val
+def _parse_column_rhs(text: str, pos: int) -> _Parsed:
+    """column_expr_rhs = "column" ws ei_oper ws col_name"""
+    if not text.startswith("column", pos):
+        return None
 
-        return {col: rhs}
+    if (parsed := _parse_oper(text, _ws(text, pos + 6), _EI_RHS_OPERS)) is None:
+        return None
 
-    # -------------------------------------------------------------------------
-    #               Right Hand Side (RHS) Expressions
-    # -------------------------------------------------------------------------
+    oper, pos = parsed
+    if (parsed := _parse_regex(text, _ws(text, pos), _COL_NAME)) is None:
+        return None
 
-    def visit_num_oper_expr_rhs(self, node, vc):  # noqa
-        """returns the number operator and RHS value"""
-        oper, _, tok = vc
-        return [oper[0], tok]
+    col, pos = parsed
+    return ["column", oper, sys.intern(col)], pos
 
-    def visit_str_oper_expr_rhs(self, node, vc):  # noqa
-        """returns the string operator and RHS value"""
-        oper, _, tok = vc
-        return [oper[0], tok]
 
-    def visit_oper_expr_rhs(self, node, vc):  # noqa
-        """returns the operattor right-hand-side expression list item"""
-        return vc[0]
+def _parse_color_rhs(text: str, pos: int) -> _Parsed:
+    """color_expr_rhs = "color" ws num_oper_expr_rhs"""
+    if not text.startswith("color", pos):
+        return None
 
-    def visit_column_expr_rhs(self, node, vc):  # noqa
-        """return the 'column' operation right-hand-side expression list item"""
-        col_oper, _, oper, _, col_name = vc
-        return [col_oper.text, oper, col_name]
+    if (parsed := _parse_num_rhs(text, _ws(text, pos + 5))) is None:
+        return None
 
-    def visit_color_expr_rhs(self, node, vc):  # noqa
-        """return the 'column' operation + right-hand-side expression list item"""
-        col_oper, _, oper_val = vc
-        return [col_oper.text, *oper_val]
+    rhs, pos = parsed
+    return ["color", *rhs], pos
 
-    # -------------------------------------------------------------------------
-    #                      Token Expressions
-    # -------------------------------------------------------------------------
 
-    def visit_group_tok(self, node, vc):  # noqa
-        """returns the group operator (and, or) value"""
-        return node.text
+def _parse_num_rhs(text: str, pos: int) -> _Parsed:
+    """num_oper_expr_rhs = (num_oper / ei_oper) ws int_tok"""
+    if (parsed := _parse_oper(text, pos, _NUM_RHS_OPERS)) is None:
+        return None
 
-    def visit_cmp_value_tok(self, node, vc):  # noqa
-        """children will either be a single node-value or a quoted-value"""
-        vc = vc.pop(0)
+    oper, pos = parsed
+    if (parsed := _parse_regex(text, _ws(text, pos), _INT_TOK)) is None:
+        return None
 
-        if isinstance(vc, RegexNode):
-            return vc.text
+    value, pos = parsed
+    return [oper, int(value)], pos
 
-        value_node = vc[0] if len(vc) == 1 else vc[1]
-        return value_node.text
 
-    def visit_int_tok(self, node, vc):  # noqa
-        """returns the value as an integer"""
-        return int(node.text)
+def _parse_str_rhs(text: str, pos: int) -> _Parsed:
+    """str_oper_expr_rhs = (str_oper / ei_oper) ws cmp_value_tok"""
+    if (parsed := _parse_oper(text, pos, _STR_RHS_OPERS)) is None:
+        return None
 
-    def visit_col_name(self, node, vc):  # noqa
-        """returns the column name (str)"""
-        return node.text
+    oper, pos = parsed
+    if (parsed := _parse_value(text, _ws(text, pos))) is None:
+        return None
 
-    # -------------------------------------------------------------------------
-    #                      Operator Nodes
-    # -------------------------------------------------------------------------
+    value, pos = parsed
+    return [oper, value], pos
 
-    def visit_str_oper(self, node, vc):  # noqa
-        """returns the string operator in IPF API form"""
-        return _OPERATORS[node.text]
 
-    def visit_num_oper(self, node, vc):  # noqa
-        """returns the number operator in IPF API form"""
-        return _OPERATORS[node.text]
+def _parse_value(text: str, pos: int) -> _Parsed:
+    """cmp_value_tok = sq_tok / dq_tok / word"""
 
-    def visit_ei_oper(self, node, vc):  # noqa
-        """returns the equality operator in IPF API form"""
-        return _OPERATORS[node.text]
+    # the alternatives are decided by the first character since a word never
+    # starts with a quote.
 
-    def generic_visit(self, node, visited_children):
-        """pass through for nodes not explicility visited"""
-        return visited_children or node
+    if (quoted := _QUOTED_TOKS.get(text[pos : pos + 1])) is None:
+        return _parse_regex(text, pos, _WORD)
+
+    if (found := quoted.match(text, pos)) is None:
+        return None
+
+    return found.group(1), found.end()
+
+
+def _copy_filter(value: Any) -> Any:
+    """
+    returns a copy of the filter value; the dict and list items are copied,
+    and the remaining values (str, int, bool) are immutable.  This is cheaper
+    than copy.deepcopy since there is no memo of the copied items.
+    """
+    if isinstance(value, dict):
+        return {key: _copy_filter(item) for key, item in value.items()}
 
+    if isinstance(value, list):
+        return [_copy_filter(item) for item in value]
 
-_filter_builder = _FilterConstructor()
+    return value
+
+
+@lru_cache(maxsize=1024)
+def _parse_filter(expr: str) -> dict:
+    """returns the cached filter dictionary for the expression"""
+    parsed = _parse_expr(expr, _ws(expr, 0))
+
+    if parsed is None or _ws(expr, parsed[1]) != len(expr):
+        raise ValueError(f"Invalid filter expression: {expr!r}")
+
+    return parsed[0]
 
 
 def parse_filter(expr: str) -> dict:
     """
     This function is used to convert a filter expression, as a string in the form
-    of FILTER_GRAMMER, and return the IPF filter dictionary that is consumed by
-    the `filters` body parameters.
+    of the grammar described in this module, and return the IPF filter dictionary
+    that is consumed by the `filters` body parameters.
 
     Parameters
     ----------
     expr
         The filter expression, for example "hostname = switch1.dc1"
+
+    Notes
+    -----
+    The parsed filters are cached by the expression since the same
+    expressions are generally used repeatedly.  A copy is returned so that
+    the Caller may modify the filter dictionary without changing the cached
+    value.
+    """
+    return _copy_filter(_parse_filter(expr))
+
+
+def make_filter(col: str, oper: str, value: Any) -> dict:
+    """
+    This function returns the IPF filter dictionary for a single comparison
+    without parsing an expression; for use when the column and value are
+    already known to the Caller, for example in a loop of hostnames.
+
+    Parameters
+    ----------
+    col
+        The column name, for example "hostname"
+
+    oper
+        The filter expression operator, for example "=" or "~"
+
+    value
+        The comparison value, used as-is; except for the "?" operator whose
+        value must be either True, False, "true", or "false"
+
+    Returns
+    -------
+    dict, for example make_filter("hostname", "=", "switch1") returns
+    {"hostname": ["eq", "switch1"]}
+    """
+    if (api_oper := _OPERATORS.get(oper)) is None:
+        raise ValueError(f"Invalid filter operator: {oper!r}")
+
+    # the "empty" value is converted the same as by the parser.
+
+    if api_oper == "empty" and value.__class__ is not bool:
+        if (value := _EMPTY_VALUES.get(str(value).lower())) is None:
+            raise ValueError("'empty' value must be either 'true' or 'false'")
+
+    return {col: [api_oper, value]}
+
+
+def _fill_filter(value: Any, fields: Dict[Any, str], values: Dict[str, Any]) -> Any:
+    """
+    returns a copy of the template filter value with each placeholder token,
+    used as a key or as a value, replaced by the Caller provided value.
+    """
+    if isinstance(value, dict):
+        return {
+            (values[fields[key]] if key in fields else key): _fill_filter(
+                item, fields, values
+            )
+            for key, item in value.items()
+        }
+
+    if isinstance(value, list):
+        return [_fill_filter(item, fields, values) for item in value]
+
+    if value.__class__ in (str, int) and value in fields:
+        return values[fields[value]]
+
+    return value
+
+
+def _count_fields(value: Any, fields: Dict[Any, str]) -> int:
+    """returns the number of placeholder tokens used as a key or as a value"""
+    if isinstance(value, dict):
+        return sum(
+            (key in fields) + _count_fields(item, fields) for key, item in value.items()
+        )
+
+    if isinstance(value, list):
+        return sum(_count_fields(item, fields) for item in value)
+
+    return value.__class__ in (str, int) and value in fields
+
+
+def compile_filter(template: str) -> Callable[..., dict]:
+    """
+    This function parses a filter expression template once, and returns a
+    function that builds the IPF filter dictionary for the given placeholder
+    values.  This avoids parsing a new expression string for every value,
+    for example when fetching the same table for many devices.
+
+    Parameters
+    ----------
+    template
+        The filter expression with str.format style named placeholders, for
+        example "and(hostname = {name}, site = {site})".
+
+    Returns
+    -------
+    Callable that accepts the placeholder values as keyword arguments and
+    returns a new filter dictionary, for example:
+
+        by_host = compile_filter("hostname = {name}")
+        by_host(name="switch1")  # {"hostname": ["eq", "switch1"]}
+
+    Raises
+    ------
+    ValueError
+        If the template is not a valid filter expression, or a placeholder
+        is not an entire column name or value; for example "sw-{n}", or the
+        value of the "?" operator.
+
+    Notes
+    -----
+    The values are used as-is and are not parsed; that is the Caller should
+    pass an int value when the filter compares numbers.
     """
-    res = _grammer.parse(expr.strip().replace("\n", ""))
-    return _filter_builder.visit(res)[0]
+    text = []
+    tokens: Dict[str, str] = {}
+    n_fields = 0
+    next_token = 7_310_000_000
+
+    for literal, name, *_ in Formatter().parse(template):
+        text.append(literal)
+        if name is None:
+            continue
+        if not name:
+            raise ValueError(
+                f"Filter template placeholders must be named: {template!r}"
+            )
+        if name not in tokens:
+            # use a number for the placeholder since it is a valid token in
+            # every value position of the grammar.
+            while str(next_token) in template:
+                next_token += 1
+            tokens[name] = str(next_token)
+            next_token += 1
+        text.append(tokens[name])
+        n_fields += 1
+
+    expr = "".join(text)
+
+    try:
+        parsed = _parse_filter(expr)
+
+    except RuntimeError:
+        # the "?" operator value must be either "true" or "false" when the
+        # template is parsed, and so cannot be a placeholder.
+
+        if any(re.search(rf"\?\s*['\"]?{token}", expr) for token in tokens.values()):
+            raise ValueError(
+                f"Filter template placeholders cannot be the '?' value: {template!r}"
+            )
+        raise
+
+    fields: Dict[Any, str] = {}
+    for name, token in tokens.items():
+        fields[token] = fields[int(token)] = name
+
+    # each placeholder must be parsed as an entire token, otherwise it is
+    # part of a larger value, such as "sw-{n}", that cannot be replaced.
+
+    if _count_fields(parsed, fields) != n_fields:
+        raise ValueError(
+            f"Filter template placeholders must be an entire column name or "
+            f"value: {template!r}"
+        )
+
+    def build_filter(**values: Any) -> dict:
+        if missing := tokens.keys() - values.keys():
+            raise KeyError(f"Missing filter template values: {sorted(missing)}")
+        if unknown := values.keys() - tokens.keys():
+            raise TypeError(f"Unknown filter template values: {sorted(unknown)}")
+        return _fill_filter(parsed, fields, values)
+
+    return build_filter
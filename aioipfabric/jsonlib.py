@@ -0,0 +1,111 @@
+#  Copyright 2020 Jeremy Schulman
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""
+This module contains the JSON encode/decode functions used by the client.  If
+the orjson package is installed, then it is used; otherwise the Python json
+module is used.  In both cases `loads` accepts bytes so that the response
+content can be decoded without first converting it to a string, and `dumps`
+returns bytes so that the value can be used as request content.
+
+If the ijson package is installed, then `aiter_items` decodes the items of a
+JSON array incrementally as the response body is received; otherwise the
+complete body is decoded once it has been received.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Any, AsyncIterator
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+    import json
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["loads", "dumps", "aiter_items"]
+
+
+# -----------------------------------------------------------------------------
+#
+#                                 CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+if orjson:
+    loads = orjson.loads
+
+    def dumps(obj: Any) -> bytes:
+        """return the JSON encoding of `obj` as bytes"""
+        # the table API request bodies use the TableFields (str, Enum) values
+        # as keys, which orjson only accepts with the OPT_NON_STR_KEYS option.
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+else:  # pragma: no cover
+    loads = json.loads
+
+    def dumps(obj: Any) -> bytes:
+        """return the JSON encoding of `obj` as bytes"""
+        return json.dumps(obj).encode()
+
+
+async def aiter_items(
+    chunks: AsyncIterator[bytes], key: str = "data"
+) -> AsyncIterator[Any]:
+    """
+    Asynchronously iterate through the items of the array found at `key` in
+    the JSON object encoded by `chunks`; for example the "data" records in a
+    table response body.
+
+    Parameters
+    ----------
+    chunks: AsyncIterator[bytes]
+        The encoded JSON object, for example `httpx.Response.aiter_bytes()`
+
+    key: str
+        The object key of the array
+    """
+    if ijson is None:
+        body = loads(b"".join([chunk async for chunk in chunks]))
+        for item in body[key]:
+            yield item
+        return
+
+    items = ijson.sendable_list()
+    parser = ijson.items_coro(items, f"{key}.item", use_float=True)
+
+    async for chunk in chunks:
+        parser.send(chunk)
+        for item in items:
+            yield item
+        del items[:]
+
+    parser.close()
+    for item in items:
+        yield item
@@ -17,7 +17,7 @@
 # System Imports
 # -----------------------------------------------------------------------------
 
-from dataclasses import dataclass
+from typing import Final
 
 # -----------------------------------------------------------------------------
 # Public Imports
@@ -32,11 +32,13 @@ from httpx import Response
 from aioipfabric.base_client import IPFBaseClient, table_api
 
 
-@dataclass
+NEIGHBORS_URI: Final = "/tables/neighbors/all"
+
+
 class URIs:
-    """identifies API URL endpoings used"""
+    """identifies API URL endpoings used; retained for backwards compatibility"""
 
-    neighbors = "/tables/neighbors/all"
+    neighbors = NEIGHBORS_URI
 
 
 class IPFCablingMixin(IPFBaseClient):
@@ -54,4 +56,4 @@ class IPFCablingMixin(IPFBaseClient):
         ]
 
         request.setdefault("columns", columns)
-        return await self.api.post(URIs.neighbors, json=request)
+        return await self.api.post(NEIGHBORS_URI, json=request)
@@ -17,9 +17,9 @@
 # System Imports
 # -----------------------------------------------------------------------------
 
-from typing import Optional, Callable, Dict, Awaitable, List
-from asyncio import Semaphore
-from dataclasses import dataclass
+from typing import Optional, Callable, Dict, Awaitable, List, Final, Union
+from typing import AsyncIterator
+from asyncio import Semaphore, as_completed, ensure_future, gather
 import logging
 
 # -----------------------------------------------------------------------------
@@ -27,8 +27,8 @@ import logging
 # -----------------------------------------------------------------------------
 
 import aioipfabric
-from aioipfabric.aiofut import as_completed
 from aioipfabric.base_client import IPFBaseClient
+from aioipfabric.jsonlib import loads, dumps
 
 # -----------------------------------------------------------------------------
 # Exports
@@ -46,13 +46,30 @@ __all__ = ["IPFConfigsMixin", "URIs"]
 _LOG = logging.getLogger(aioipfabric.__package__)
 
 
-@dataclass
+DEVICE_CONFIG_REFS_URI: Final = "tables/management/configuration"
+DOWNLOAD_DEVICE_CONFIG_URI: Final = "tables/management/configuration/download"
+TRIGGER_BACKUP_URI: Final = "discovery/trigger-config-backup"
+
+# the columns of the device configuration "hash" records; these do not change
+# between calls and are used as-is in each request payload.
+
+_CONFIG_REF_COLUMNS: Final = (
+    "id",
+    "sn",
+    "hostname",
+    "lastChangeAt",
+    "lastCheckAt",
+    "status",
+    "hash",
+)
+
+
 class URIs:
-    """API endpoints"""
+    """API endpoints; retained for backwards compatibility"""
 
-    device_config_refs = "tables/management/configuration"
-    download_device_config = "tables/management/configuration/download"
-    trigger_backup = "discovery/trigger-config-backup"
+    device_config_refs = DEVICE_CONFIG_REFS_URI
+    download_device_config = DOWNLOAD_DEVICE_CONFIG_URI
+    trigger_backup = TRIGGER_BACKUP_URI
 
 
 class IPFConfigsMixin(IPFBaseClient):
@@ -62,15 +79,17 @@ class IPFConfigsMixin(IPFBaseClient):
 
     async def fetch_device_configs(
         self,
-        on_config: Callable[[Dict, str], Awaitable[None]],
+        on_config: Callable[[Dict, Union[str, AsyncIterator[str]]], Awaitable[None]],
         since_ts: int,
         all_configs: Optional[bool] = False,
         before_ts: Optional[int] = None,
         filters: Optional[Dict] = None,
+        hostnames: Optional[List[str]] = None,
         device_filter: Optional[Callable[[Dict], bool]] = None,
         sanitized: Optional[bool] = False,
         batch_sz: Optional[int] = 1,
         dry_run: Optional[bool] = False,
+        stream: Optional[bool] = False,
     ) -> List[Dict]:
         """
         This coroutine is used to download the latest copy of devices in the
@@ -111,6 +130,13 @@ class IPFConfigsMixin(IPFBaseClient):
             extact the backup record hashs; which primarily include ['sn',
             'hostname', 'status']
 
+        hostnames:
+            The optional list of hostnames; only the configurations of devices
+            whose hostname contains one of these values are fetched.  All of
+            the hostnames are looked up in a single request using an 'or'
+            filter rather than a request per hostname; and so the `filters`
+            must not also include an 'or' filter.
+
         device_filter:
             The Caller can optionally provide a function used to filter if the
             provided device-hash record should be used or not to retrieve the
@@ -135,6 +161,14 @@ class IPFConfigsMixin(IPFBaseClient):
             that would be used to retrieve the configuration files; but
             not actually get the configs.
 
+        stream:
+            When True the `on_config` coroutine is given an async iterator of
+            the configuration text chunks, rather than the complete text, while
+            the configuration is being downloaded.  This allows the Caller to
+            write large configurations to a file without holding the entire
+            content in memory.  An error response raises httpx.HTTPStatusError
+            rather than being passed to `on_config`.
+
         Returns
         -------
         List of device-hash records that were used to perform the config file
@@ -178,38 +212,39 @@ class IPFConfigsMixin(IPFBaseClient):
         if filters:
             filters_.update(filters)
 
+        if hostnames:
+            if "or" in filters_:
+                raise ValueError("hostnames cannot be used with an 'or' filter")
+            filters_["or"] = [{"hostname": ["like", name]} for name in hostnames]
+
         payload = {
-            "columns": [
-                "id",
-                "sn",
-                "hostname",
-                "lastChangeAt",
-                "lastCheckAt",
-                "status",
-                "hash",
-            ],
+            "columns": _CONFIG_REF_COLUMNS,
             "filters": filters_,
             "sort": {"column": since_criteria, "order": "desc"},
             "reports": "/management/configuration/first",
         }
 
-        res = await self.api.post(URIs.device_config_refs, json=payload)
+        res = await self.api.post(DEVICE_CONFIG_REFS_URI, content=dumps(payload))
         res.raise_for_status()
-        records = res.json()["data"]
+        records = loads(res.content)["data"]
 
         # NOTE: For unknown reasons, there are devices that have more than one
         # record in this response collection.  Therefore, we need to retain only
-        # the most recent value using a dict and the setdefault method
-
-        if before_ts:
-            records = [rec for rec in records if rec[since_criteria] <= before_ts]
+        # the most recent value; the records are sorted most recent first, so
+        # this is the first record of each serial-number.
 
-        filtered_records = dict()
+        seen_sn = set()
+        filtered_records = list()
 
         for rec in records:
-            filtered_records.setdefault(rec["sn"], rec)
+            if before_ts and rec[since_criteria] > before_ts:
+                continue
+            if (sn := rec["sn"]) in seen_sn:
+                continue
+            seen_sn.add(sn)
+            filtered_records.append(rec)
 
-        records = list(filtered_records.values())
+        records = filtered_records
 
         if dry_run is True:
             return records
@@ -225,52 +260,72 @@ class IPFConfigsMixin(IPFBaseClient):
 
         batching_sem = Semaphore(batch_sz)
 
-        async def fetch_device_config(_hash):
-            """perform a config fetch limited by semaphore"""
+        async def fetch_device_config(rec):
+            """
+            perform a config fetch limited by semaphore; returns the device
+            record with the response so that the record is available when the
+            fetch completes.
+            """
+            params = {"hash": rec["hash"], "sanitized": sanitized}
+
             async with batching_sem:
-                api_res = await self.api.get(
-                    URIs.download_device_config,
-                    params={"hash": _hash, "sanitized": sanitized},
-                    timeout=60,
-                )
-                return api_res
-
-        # create a lookup dictionary that will map the fetch coroutine to the
-        # hash record so that when the coroutine completes we can obtain the
-        # source device record; this is needed per the use of the `as_completed`
-        # function.
+                if not stream:
+                    return rec, await self.api.get(
+                        DOWNLOAD_DEVICE_CONFIG_URI, params=params, timeout=60
+                    )
+
+                # the config is passed to the Caller while it is downloaded,
+                # and so the semaphore is held until the Caller is done.  The
+                # API session admission slot is released once the response
+                # headers are received, so the Caller may make API calls.
+
+                async with self.api.stream(
+                    "GET", DOWNLOAD_DEVICE_CONFIG_URI, params=params, timeout=60
+                ) as api_res:
+                    api_res.raise_for_status()
+                    await on_config(rec, api_res.aiter_text())
+
+                return rec, None
 
         device_filter = device_filter or (lambda x: True)
 
-        fetch_tasks = {
-            fetch_device_config(rec["hash"]): rec
-            for rec in records
-            if device_filter(rec)
-        }
+        fetch_records = [rec for rec in records if device_filter(rec)]
 
         _LOG.debug(
-            f"Fetching {len(fetch_tasks)} device configurations in {batch_sz} batches ... "
+            f"Fetching {len(fetch_records)} device configurations in {batch_sz} batches ... "
         )
 
-        async for task in as_completed(fetch_tasks, timeout=5 * 60):
-            # the `task` instance will provide both the config text as a
-            # result, and allow use to use the associated coroutine as a lookup
-            # so that we can obtain the device record associated with the
-            # config.
+        fetch_tasks = [ensure_future(fetch_device_config(rec)) for rec in fetch_records]
+
+        try:
+            for next_done in as_completed(fetch_tasks, timeout=5 * 60):
+                # each fetch provides the device record along with the config
+                # response.
+
+                rec, t_result = await next_done
+
+                if stream:
+                    continue
+
+                # pass the device record and device configuration back to the
+                # Caller via the callback coroutine so that they can do what
+                # they want; for example save the contents to filesystem.
 
-            rec = fetch_tasks[task.get_coro()]
-            t_result = task.result()
+                await on_config(rec, t_result.text)
 
-            # pass the device record and device configuration back to the Caller
-            # via the callback coroutine so that they can do what they want; for
-            # example save the contents to filesystem.
+        finally:
+            # if a fetch fails, or the Caller callback raises an exception,
+            # then the remaining fetches are cancelled, and their outcome
+            # retrieved so that they are not reported as never retrieved.
 
-            await on_config(rec, t_result.text)
+            for task in fetch_tasks:
+                task.cancel()
+            await gather(*fetch_tasks, return_exceptions=True)
 
         # return only the list of device records that were subject to backup
         # processing.
 
-        return list(fetch_tasks.values())
+        return fetch_records
 
     async def trigger_backup(self, **options):
         """
@@ -292,5 +347,5 @@ class IPFConfigsMixin(IPFBaseClient):
         ------
         httpx.Exception
         """
-        res = await self.api.post(URIs.trigger_backup, json=options)
+        res = await self.api.post(TRIGGER_BACKUP_URI, content=dumps(options))
         res.raise_for_status()
@@ -20,14 +20,14 @@ This module contains IPF client mixins that perform the "diagram" queries.
 # System Imports
 # -----------------------------------------------------------------------------
 
-from typing import Optional, Dict, Union
-from dataclasses import dataclass
+from typing import Optional, Dict, Union, Final
 
 # -----------------------------------------------------------------------------
 # Private Imports
 # -----------------------------------------------------------------------------
 
 from aioipfabric.base_client import IPFBaseClient
+from aioipfabric.jsonlib import loads
 
 
 # -----------------------------------------------------------------------------
@@ -37,11 +37,13 @@ from aioipfabric.base_client import IPFBaseClient
 # -----------------------------------------------------------------------------
 
 
-@dataclass
+END_TO_END_PATH_URI: Final = "graph/end-to-end-path"
+
+
 class URIs:
-    """identifies API URL endpoints used"""
+    """identifies API URL endpoints used; retained for backwards compatibility"""
 
-    end_to_end_path = "graph/end-to-end-path"
+    end_to_end_path = END_TO_END_PATH_URI
 
 
 class IPFDiagramE2EMixin(IPFBaseClient):
@@ -83,7 +85,7 @@ class IPFDiagramE2EMixin(IPFBaseClient):
         IPF blog: https://ipfabric.io/blog/end-to-end-path-simulation-with-api/
         """
         res = await self.api.get(
-            URIs.end_to_end_path,
+            END_TO_END_PATH_URI,
             params=dict(
                 source=src_ip,
                 sourcePort=src_port,
@@ -96,4 +98,4 @@ class IPFDiagramE2EMixin(IPFBaseClient):
             ),
         )
         res.raise_for_status()
-        return res.json()
+        return loads(res.content)
@@ -21,14 +21,14 @@ This module contains IPF client mixins that perform the "diagram" queries.
 # -----------------------------------------------------------------------------
 
 import ipaddress
-from typing import Optional, Union
-from dataclasses import dataclass
+from typing import Optional, Union, Final
 
 # -----------------------------------------------------------------------------
 # Private Imports
 # -----------------------------------------------------------------------------
 
 from aioipfabric.base_client import IPFBaseClient
+from aioipfabric.jsonlib import loads
 
 
 # -----------------------------------------------------------------------------
@@ -38,12 +38,15 @@ from aioipfabric.base_client import IPFBaseClient
 # -----------------------------------------------------------------------------
 
 
-@dataclass
+GRAPHS_JSON_URI: Final = "graphs"
+GRAPHS_SVG_URI: Final = "graphs/svg"
+
+
 class URIs:
-    """identifies API URL endpoints used"""
+    """identifies API URL endpoints used; retained for backwards compatibility"""
 
-    json_path = "graphs"
-    svg_path = "graphs/svg"
+    json_path = GRAPHS_JSON_URI
+    svg_path = GRAPHS_SVG_URI
 
 
 class IPFDiagramPathMixin(IPFBaseClient):
@@ -247,13 +250,13 @@ class IPFDiagramPathMixin(IPFBaseClient):
         Dictionary if JSON or Bytes if SVG
         """
         data = dict(parameters=parameters, snapshot=self.active_snapshot)
-        api = URIs.json_path if self.svg is False else URIs.svg_path
+        api = GRAPHS_JSON_URI if self.svg is False else GRAPHS_SVG_URI
         res = await self.api.post(api, json=data)
         res.raise_for_status()
         if self.svg:
             return res.content
         else:
-            return res.json()
+            return loads(res.content)
 
     @staticmethod
     def check_proto(parameters, flags) -> dict:
@@ -17,7 +17,7 @@
 # System Imports
 # -----------------------------------------------------------------------------
 
-from dataclasses import dataclass
+from typing import Final
 
 # -----------------------------------------------------------------------------
 # Public Imports
@@ -29,7 +29,7 @@ from httpx import Response
 # Private Imports
 # -----------------------------------------------------------------------------
 
-from aioipfabric.base_client import IPFBaseClient, table_api
+from aioipfabric.base_client import IPFBaseClient, table_api, SNAPSHOTS_URI
 from aioipfabric.consts import COLOR_GREEN, TableFields
 
 # -----------------------------------------------------------------------------
@@ -39,15 +39,20 @@ from aioipfabric.consts import COLOR_GREEN, TableFields
 # -----------------------------------------------------------------------------
 
 
-@dataclass
+DEVICES_URI: Final = "/tables/inventory/devices"
+DEVICE_PARTS_URI: Final = "/tables/inventory/pn"
+DEVICE_INTERFACES_URI: Final = "/tables/inventory/interfaces"
+MANAGED_IPADDRS_URI: Final = "/tables/addressing/managed-devs"
+
+
 class URIs:
-    """identifies API URL endpoings used"""
+    """identifies API URL endpoings used; retained for backwards compatibility"""
 
-    devices = "/tables/inventory/devices"
-    device_parts = "/tables/inventory/pn"
-    device_interfaces = "/tables/inventory/interfaces"
-    managed_ipaddrs = "/tables/addressing/managed-devs"
-    snapshots = "/snapshots"
+    devices = DEVICES_URI
+    device_parts = DEVICE_PARTS_URI
+    device_interfaces = DEVICE_INTERFACES_URI
+    managed_ipaddrs = MANAGED_IPADDRS_URI
+    snapshots = SNAPSHOTS_URI
 
 
 DEFAULT_PARTS_COLUMNS = [
@@ -105,7 +110,7 @@ class IPFInventoryMixin(IPFBaseClient):
             "model",
         ]
         request.setdefault(TableFields.columns, default_columns)
-        return await self.api.post(URIs.devices, json=request)
+        return await self.api.post(DEVICES_URI, json=request)
 
     @table_api
     async def fetch_ipaddrs(self, request: dict) -> Response:
@@ -134,7 +139,7 @@ class IPFInventoryMixin(IPFBaseClient):
 
         request.setdefault("columns", default_columns)
 
-        return await self.api.post(URIs.managed_ipaddrs, json=request)
+        return await self.api.post(MANAGED_IPADDRS_URI, json=request)
 
     @table_api
     async def fetch_optics(self, request: dict) -> Response:
@@ -156,7 +161,7 @@ class IPFInventoryMixin(IPFBaseClient):
         request["filters"].update(filter_report)
         request["reports"] = "/inventory/part-numbers"
 
-        return await self.api.post(URIs.device_parts, json=request)
+        return await self.api.post(DEVICE_PARTS_URI, json=request)
 
     @table_api
     async def fetch_device_parts(self, request: dict) -> Response:
@@ -173,7 +178,7 @@ class IPFInventoryMixin(IPFBaseClient):
         The HTTPx response, which will be post-processed by the table_api decorator.
         """
         request.setdefault("columns", DEFAULT_PARTS_COLUMNS)
-        return await self.api.post(URIs.device_parts, json=request)
+        return await self.api.post(DEVICE_PARTS_URI, json=request)
 
     @table_api
     async def fetch_device_interfaces(self, request: dict) -> Response:
@@ -190,4 +195,4 @@ class IPFInventoryMixin(IPFBaseClient):
         The HTTPx response, which will be post-processed by the table_api decorator.
         """
         request.setdefault("columns", DEFAULT_INTERFACE_COLUMNS)
-        return await self.api.post(URIs.device_interfaces, json=request)
+        return await self.api.post(DEVICE_INTERFACES_URI, json=request)
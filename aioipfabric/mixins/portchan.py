@@ -17,7 +17,7 @@
 # System Imports
 # -----------------------------------------------------------------------------
 
-from dataclasses import dataclass
+from typing import Final
 from enum import Enum
 import re
 
@@ -50,11 +50,13 @@ DEFAULT_PORTCHAN_MEMBER_COLUMNS = [
 ]
 
 
-@dataclass
+MEMBER_STATUS_URI: Final = "/tables/interfaces/port-channel/member-status"
+
+
 class URIs:
-    """identifies API URL endpoints used"""
+    """identifies API URL endpoints used; retained for backwards compatibility"""
 
-    member_status = "/tables/interfaces/port-channel/member-status"
+    member_status = MEMBER_STATUS_URI
 
 
 class PortChannelMemberStates(str, Enum):
@@ -76,7 +78,7 @@ class IPFPortChannelsMixin(IPFBaseClient):
     @table_api
     async def fetch_portchannels(self, request: dict) -> Response:
         request.setdefault(TableFields.columns, DEFAULT_PORTCHAN_MEMBER_COLUMNS)
-        return await self.api.post(URIs.member_status, json=request)
+        return await self.api.post(MEMBER_STATUS_URI, json=request)
 
     @staticmethod
     def xfrec_portchannel_members(rec):
@@ -24,6 +24,7 @@ from functools import wraps
 # -----------------------------------------------------------------------------
 
 from .consts import TableFields
+from .jsonlib import loads
 
 # -----------------------------------------------------------------------------
 #
@@ -31,6 +32,59 @@ from .consts import TableFields
 #
 # -----------------------------------------------------------------------------
 
+# the request body field names, bound once at import rather than looked up on
+# the TableFields class on each call.
+
+_SNAPSHOT = TableFields.snapshot
+_FILTERS = TableFields.filters
+_COLUMNS = TableFields.columns
+_PAGINATION = TableFields.pagination
+_REPORTS = TableFields.reports
+_SORT = TableFields.sort
+
+
+def table_request(
+    snapshot,
+    *,
+    filters=None,
+    columns=None,
+    pagination=None,
+    sort=None,
+    reports=None,
+    request=None,
+) -> dict:
+    """
+    Return the request body used to fetch records from a Table; see `table_api`
+    for a description of the parameters.
+    """
+
+    # the common case is that the Caller does not provide a starting request,
+    # and so the payload is created with the required fields.
+
+    if request is None:
+        payload = {_SNAPSHOT: snapshot, _FILTERS: filters or {}}
+    else:
+        payload = request
+        payload.setdefault(_SNAPSHOT, snapshot)
+        payload.setdefault(_FILTERS, filters or {})
+
+    if columns:
+        payload[_COLUMNS] = columns
+
+    # TODO: perhaps add a default_pagination setting to the IP Client?
+    #       for now the default will be no pagnication
+
+    if pagination:
+        payload[_PAGINATION] = pagination
+
+    if reports:
+        payload[_REPORTS] = reports
+
+    if sort:
+        payload[_SORT] = sort
+
+    return payload
+
 
 def table_api(methcoro):
     """Method decorator for all Table related APIs"""
@@ -63,7 +117,12 @@ def table_api(methcoro):
         then return value is the entire native response body that contains both
         the 'data' and '_meta' keys (not the underscore for _meta in this
         case!).  If `return_as` is set to 'raw' then the response is the raw
-        httpx.Response object.
+        httpx.Response object; the response is neither checked nor decoded, so
+        a Caller that needs the decoded body should use "body" rather than
+        decoding the raw response.  If `return_as` is set to "bytes" or "text"
+        then the return value is the response body content, as bytes or str
+        respectively, without JSON decoding; for example when the body is
+        to be written to a file.
 
         Parameters
         ----------
@@ -97,7 +156,9 @@ def table_api(methcoro):
             creates a new dict object that is populated based on the above
             description.
 
-        return_as
+        return_as: str
+            One of "data" (default), "meta", "body", "raw", "bytes", or "text"
+            as described above.
 
         Other Parameters
         ----------------
@@ -108,33 +169,40 @@ def table_api(methcoro):
         Depends on the parameter `return_as` as described above.
         """
 
-        payload = request or {}
-        payload.setdefault(TableFields.snapshot, self.active_snapshot)
-        payload.setdefault(TableFields.filters, filters or {})
+        payload = table_request(
+            self.active_snapshot,
+            filters=filters,
+            columns=columns,
+            pagination=pagination,
+            sort=sort,
+            reports=reports,
+            request=request,
+        )
+
+        res = await methcoro(self, request=payload, **kwargs)
 
-        if columns:
-            payload[TableFields.columns] = columns
+        if return_as == "raw":
+            return res
 
-        # TODO: perhaps add a default_pagination setting to the IP Client?
-        #       for now the default will be no pagnication
+        res.raise_for_status()
 
-        if pagination:
-            payload["pagination"] = pagination
+        if return_as == "bytes":
+            return res.content
 
-        if reports:
-            payload["reports"] = reports
+        if return_as == "text":
+            return res.text
 
-        if sort:
-            payload["sort"] = sort
+        body = loads(res.content)
 
-        res = await methcoro(self, request=payload, **kwargs)
+        if return_as == "data":
+            return body["data"]
 
-        if return_as == "raw":
-            return res
+        if return_as == "meta":
+            return body["_meta"]
 
-        res.raise_for_status()
-        body = res.json()
+        if return_as == "body":
+            return body
 
-        return {"data": body["data"], "meta": body["_meta"], "body": body}[return_as]
+        raise ValueError(return_as)
 
     return wrapper
@@ -8,9 +8,6 @@ from operator import itemgetter
 from tabulate import tabulate  # noqa: you must install tabulate in your virtualenv
 
 
-loop = asyncio.get_event_loop()
-
-
 async def run(ipf: IPFabricClient, device_list, callback):
     def _done(_task: asyncio.Task):
         _host = _task.get_name()
@@ -24,7 +21,7 @@ async def run(ipf: IPFabricClient, device_list, callback):
     tasks = {
         [
             (
-                task := loop.create_task(
+                task := asyncio.create_task(
                     ipf.fetch_devices(filters=ipf.parse_filter(f"hostname ~ '{host}'")),
                     name=host,
                 )
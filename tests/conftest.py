@@ -0,0 +1,35 @@
+import httpx
+import pytest
+
+from aioipfabric import IPFabricClient
+from aioipfabric.api import IPFSession
+
+BASE_URL = "https://ipf.test/api/v5.0/"
+
+
+@pytest.fixture
+def make_session():
+    """returns a factory of IPFSession instances that use the given handler"""
+
+    def factory(handler, **clientopts):
+        return IPFSession(
+            base_url=BASE_URL, transport=httpx.MockTransport(handler), **clientopts
+        )
+
+    return factory
+
+
+@pytest.fixture
+def make_client():
+    """returns a factory of IPFabricClient instances that use the given handler"""
+
+    def factory(handler, *mixin_classes, **clientopts):
+        clientopts.setdefault("token", "T")
+        clientopts.setdefault("base_url", BASE_URL)
+        return IPFabricClient(
+            *mixin_classes,
+            transport=httpx.MockTransport(handler),
+            **clientopts,
+        )
+
+    return factory
@@ -0,0 +1,256 @@
+import asyncio
+import inspect
+
+import httpx
+import pytest
+
+from aioipfabric.api import IPFSession
+
+
+def test_refresh_token_cancel_one_caller(make_session):
+    refreshes = 0
+
+    async def handler(request):
+        nonlocal refreshes
+        refreshes += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"accessToken": "A1"})
+
+    async def main():
+        api = make_session(handler, refresh_token="R1")
+        first = asyncio.create_task(api.authenticate())
+        second = asyncio.create_task(api.authenticate())
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        await second
+        await api.aclose()
+        return api.headers["Authorization"]
+
+    assert asyncio.run(main()) == "Bearer A1"
+    assert refreshes == 1
+
+
+def test_concurrency_limit(make_session):
+    active = 0
+    max_active = 0
+    statuses = [429]
+
+    async def handler(request):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(statuses.pop(0) if statuses else 200)
+
+    async def main():
+        api = make_session(handler, token="T", API_THROTTLE=4)
+        api.API_RETRY_MIN_WAIT = 0.001
+
+        # the 429 response drops the limit to 2 concurrent requests.
+
+        await api.get("tables/a")
+        assert api.concurrency == 2
+
+        await asyncio.gather(*(api.get("tables/a") for _ in range(8)))
+        assert max_active == 2
+
+        # the limit is increased by one per API_THROTTLE_RAMP successful
+        # responses, up to the API_THROTTLE value.
+
+        api.API_THROTTLE_RAMP = 2
+        for _ in range(4):
+            await api.get("tables/a")
+
+        await api.aclose()
+        return api.concurrency
+
+    assert asyncio.run(main()) == 4
+
+
+def test_gather_batches(make_session):
+    active = 0
+    max_active = 0
+
+    async def work(value):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.001)
+        active -= 1
+        return value
+
+    async def main():
+        api = make_session(lambda request: httpx.Response(200), token="T")
+        results = await api.gather((work(n) for n in range(5)), batch_size=2)
+        await api.aclose()
+        return results
+
+    assert asyncio.run(main()) == [0, 1, 2, 3, 4]
+    assert max_active == 2
+
+
+def test_gather_failure(make_session):
+    cancelled = []
+
+    async def work(value):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+
+    async def fail():
+        raise ValueError("failed")
+
+    aws = [work(0), fail(), work(2), work(3)]
+
+    async def main():
+        api = make_session(lambda request: httpx.Response(200), token="T")
+        try:
+            await api.gather(aws, batch_size=2)
+        finally:
+            await api.aclose()
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+
+    # the rest of the failed batch is cancelled, and the next batch is never
+    # started.
+
+    assert cancelled == [0]
+    assert all(inspect.getcoroutinestate(aw) == inspect.CORO_CLOSED for aw in aws)
+
+
+def test_rate_limit(make_session):
+    sent = []
+
+    def handler(request):
+        sent.append(loop_time())
+        return httpx.Response(200)
+
+    def loop_time():
+        return asyncio.get_running_loop().time()
+
+    async def main():
+        api = make_session(handler, token="T", API_RPS=10)
+        start = loop_time()
+        await asyncio.gather(*(api.get("tables/a") for _ in range(14)))
+        await api.aclose()
+        return start
+
+    start = asyncio.run(main())
+
+    # the first 10 requests are sent at once, and then at 10 per second.
+    assert sent[9] - start < 0.05
+    assert sent[-1] - start >= 0.35
+
+
+def test_request_retries_429(make_session):
+    statuses = [429, 429, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0))
+
+    async def main():
+        api = make_session(handler, token="T", API_THROTTLE=8)
+        api.API_RETRY_MIN_WAIT = 0.001
+        res = await api.get("tables/a")
+        await api.aclose()
+        return res, api.concurrency
+
+    res, concurrency = asyncio.run(main())
+    assert res.status_code == 200
+    assert not statuses
+
+    # the concurrency limit is halved by each 429 response.
+    assert concurrency == 2
+
+
+def test_request_429_attempts_exhausted(make_session):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429)
+
+    async def main():
+        api = make_session(handler, token="T")
+        api.API_RETRY_ATTEMPTS = 3
+        api.API_RETRY_MIN_WAIT = 0.001
+        res = await api.get("tables/a")
+        await api.aclose()
+        return res
+
+    assert asyncio.run(main()).status_code == 429
+    assert len(calls) == 3
+
+
+def test_create_authenticates():
+    def handler(request):
+        if request.url.path.endswith("/auth/login"):
+            return httpx.Response(200, json={"accessToken": "A1", "refreshToken": "R1"})
+        return httpx.Response(404)
+
+    async def main():
+        api = await IPFSession.create(
+            "https://ipf.test/api/v5.0/",
+            username="admin",
+            password="secret",
+            transport=httpx.MockTransport(handler),
+        )
+        await api.aclose()
+        return api
+
+    api = asyncio.run(main())
+    assert api.headers["Authorization"] == "Bearer A1"
+    assert api.token == "R1"
+
+
+def test_create_authenticate_failure():
+    async def main():
+        await IPFSession.create(
+            "https://ipf.test/api/v5.0/",
+            username="admin",
+            password="wrong",
+            transport=httpx.MockTransport(lambda request: httpx.Response(401)),
+        )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(main())
+
+
+def test_context_authenticate_failure(make_session):
+    async def main():
+        api = make_session(
+            lambda request: httpx.Response(401), username="u", password="p"
+        )
+        with pytest.raises(httpx.HTTPStatusError):
+            async with api:
+                pass
+        return api
+
+    assert asyncio.run(main()).is_closed
+
+
+def test_stream_releases_slot(make_session):
+    async def main():
+        api = make_session(
+            lambda request: httpx.Response(200), token="T", API_THROTTLE=1
+        )
+
+        # the admission slot is released once the response headers are
+        # received, so a request made while consuming the body is not blocked.
+
+        async with api.stream("GET", "tables/a") as res:
+            inner = await asyncio.wait_for(api.get("tables/b"), timeout=1)
+            await res.aread()
+
+        await api.aclose()
+        return inner
+
+    assert asyncio.run(main()).status_code == 200
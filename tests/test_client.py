@@ -0,0 +1,256 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from aioipfabric import IPFabricClient, base_client
+
+
+def counting_handler(requests):
+    def handler(request):
+        requests.append(request.url.path)
+        return httpx.Response(200, json={"data": [], "_meta": {"count": 0}})
+
+    return handler
+
+
+def test_fetch_table_not_cached_by_default(make_client):
+    requests = []
+
+    async def main():
+        ipf = make_client(counting_handler(requests))
+        await ipf.fetch_table(url="tables/a", columns=["x"])
+        await ipf.fetch_table(url="tables/a", columns=["x"])
+        await ipf.api.aclose()
+
+    asyncio.run(main())
+    assert len(requests) == 2
+
+
+def test_fetch_table_cache(make_client):
+    requests = []
+
+    async def main():
+        ipf = make_client(counting_handler(requests), TABLE_CACHE_MAXSIZE=2)
+
+        await ipf.fetch_table(url="tables/a", columns=["x"])
+        await ipf.fetch_table(url="tables/a", columns=["x"])
+        assert requests == ["/api/v5.0/tables/a"]
+
+        await ipf.fetch_table(url="tables/a", columns=["x"], no_cache=True)
+        assert len(requests) == 2
+
+        # the least recently used response, "tables/a", is evicted.
+
+        await ipf.fetch_table(url="tables/b", columns=["x"])
+        await ipf.fetch_table(url="tables/c", columns=["x"])
+        await ipf.fetch_table(url="tables/c", columns=["x"])
+        assert len(requests) == 4
+
+        await ipf.fetch_table(url="tables/a", columns=["x"])
+        assert len(requests) == 5
+
+        await ipf.api.aclose()
+
+    asyncio.run(main())
+
+
+def test_fetch_table_csv(make_client, tmp_path):
+    records = [{"hostname": f"sw{i}", "sn": f"SN{i}", "site": "atl"} for i in range(3)]
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={"data": records, "_meta": {"count": 3}})
+
+    async def main():
+        ipf = make_client(handler)
+        count = await ipf.fetch_table_csv(
+            "tables/inventory/devices",
+            tmp_path / "devices.csv",
+            columns=["hostname", "sn", "site"],
+            exclude=["site"],
+            filters={"site": ["eq", "atl"]},
+        )
+        await ipf.api.aclose()
+        return count
+
+    assert asyncio.run(main()) == 3
+    assert bodies[0]["columns"] == ["hostname", "sn", "site"]
+    assert bodies[0]["filters"] == {"site": ["eq", "atl"]}
+    assert (tmp_path / "devices.csv").read_text().splitlines() == [
+        "hostname,sn",
+        "sw0,SN0",
+        "sw1,SN1",
+        "sw2,SN2",
+    ]
+
+
+def test_login_version_failure(make_client):
+    async def handler(request):
+        if request.url.path.endswith("/snapshots"):
+            await asyncio.sleep(1)
+            return httpx.Response(200, json=[])
+        return httpx.Response(500)
+
+    async def main():
+        ipf = make_client(handler)
+        with pytest.raises(httpx.HTTPStatusError):
+            await ipf.login()
+        await ipf.api.aclose()
+
+        # the snapshot fetch is finished by the time login raises.
+
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert not asyncio.run(main())
+
+
+def test_fetch_table_iter(make_client):
+    records = [{"hostname": f"sw{i}"} for i in range(3)]
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"data": records, "_meta": {"count": 3}})
+
+    async def main():
+        ipf = make_client(handler)
+        recs = [rec async for rec in ipf.fetch_table_iter("tables/a", columns=["x"])]
+        await ipf.api.aclose()
+        return recs
+
+    assert asyncio.run(main()) == records
+    assert requests[0].headers["Content-Type"] == "application/json"
+    assert json.loads(requests[0].content)["columns"] == ["x"]
+
+
+SNAPSHOTS = [{"id": "S1", "name": "daily", "state": "loaded"}]
+
+
+def snapshots_handler(requests, **validators):
+    def handler(request):
+        requests.append(request)
+        conditions = {
+            "ETag": request.headers.get("If-None-Match"),
+            "Last-Modified": request.headers.get("If-Modified-Since"),
+        }
+        if validators.items() <= conditions.items():
+            return httpx.Response(304)
+        return httpx.Response(200, json=SNAPSHOTS, headers=validators)
+
+    return handler
+
+
+def test_fetch_snapshots_etag(make_client):
+    requests = []
+
+    async def main():
+        ipf = make_client(snapshots_handler(requests, ETag='"E1"'))
+        await ipf.fetch_snapshots()
+        snapshots, by_id = ipf.snapshots, ipf.snapshots_by_id
+
+        # the 304 response reuses the cached body, and so the snapshot indexes
+        # are not rebuilt.
+
+        await ipf.fetch_snapshots()
+        assert ipf.snapshots is snapshots
+        assert ipf.snapshots_by_id is by_id
+        await ipf.api.aclose()
+
+    asyncio.run(main())
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"E1"'
+
+
+def test_fetch_snapshots_last_modified(make_client):
+    requests = []
+    last_modified = "Wed, 14 Oct 2026 12:00:00 GMT"
+
+    async def main():
+        ipf = make_client(
+            snapshots_handler(requests, **{"Last-Modified": last_modified})
+        )
+        await ipf.fetch_snapshots()
+        snapshots = ipf.snapshots
+        await ipf.fetch_snapshots()
+        assert ipf.snapshots is snapshots
+
+        # without the cached response the request is not conditional.
+
+        ipf.clear_http_cache()
+        await ipf.fetch_snapshots()
+        assert ipf.snapshots == snapshots
+        await ipf.api.aclose()
+
+    asyncio.run(main())
+    assert requests[1].headers["If-Modified-Since"] == last_modified
+    assert "If-Modified-Since" not in requests[2].headers
+
+
+def test_login_after_logout(make_client):
+    paths = []
+
+    def handler(request):
+        path = request.url.path.removeprefix("/api/v5.0/")
+        paths.append(path)
+        if path == "auth/login":
+            return httpx.Response(200, json={"accessToken": "A1", "refreshToken": "R1"})
+        if path == "auth/token":
+            assert json.loads(request.content) == {"refreshToken": "R1"}
+            return httpx.Response(200, json={"accessToken": "A2"})
+        if path == "os/version":
+            return httpx.Response(200, json={"version": "5.0.1"})
+        return httpx.Response(200, json=SNAPSHOTS)
+
+    async def main():
+        ipf = make_client(handler, token=None, username="admin", password="secret")
+        await ipf.login()
+        await ipf.logout()
+
+        # the new session is authenticated with the refresh token from the
+        # prior login rather than with the login credentials.
+
+        await ipf.login()
+        await ipf.logout()
+        return ipf.api
+
+    api = asyncio.run(main())
+    assert api.headers["Authorization"] == "Bearer A2"
+    assert paths.count("auth/login") == 1
+    assert paths[-1] == "auth/token"
+
+
+def test_discover_api_version(make_client, monkeypatch):
+    monkeypatch.setattr(base_client, "_API_VERSION_PATHS", {})
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        return httpx.Response(200, json={"apiVersion": "v5.0"})
+
+    async def main():
+        clients = [make_client(handler, base_url="https://ipf.test") for _ in range(2)]
+
+        # the version discovered by the first client is reused by the second
+        # client of the same IPF system.
+
+        for ipf in clients:
+            await ipf.discover_api_version()
+            await ipf.api.aclose()
+
+        return [str(ipf.api.base_url) for ipf in clients]
+
+    assert asyncio.run(main()) == ["https://ipf.test/api/v5.0/"] * 2
+    assert paths == ["/api/version"]
+
+
+def test_to_csv_missing_field(tmp_path):
+    records = [{"hostname": "sw1", "sn": "SN1"}, {"hostname": "sw2"}]
+    IPFabricClient.to_csv(records, tmp_path / "devices.csv")
+    assert (tmp_path / "devices.csv").read_text().splitlines() == [
+        "hostname,sn",
+        "sw1,SN1",
+        "sw2,",
+    ]
@@ -0,0 +1,81 @@
+import asyncio
+
+import httpx
+import pytest
+
+from aioipfabric.mixins.configs import IPFConfigsMixin
+
+
+async def ignore_config(rec, config):
+    pass
+
+
+def test_fetch_device_configs_hostnames_or_filter(make_client):
+    def handler(request):
+        raise AssertionError("no request expected")
+
+    async def main():
+        ipf = make_client(handler, IPFConfigsMixin)
+        try:
+            await ipf.fetch_device_configs(
+                ignore_config,
+                since_ts=0,
+                filters={"or": [{"sn": ["eq", "SN1"]}, {"sn": ["eq", "SN2"]}]},
+                hostnames=["sw1"],
+            )
+        finally:
+            await ipf.api.aclose()
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+
+
+def config_handler(status_code=200):
+    records = [
+        {
+            "id": i,
+            "sn": f"SN{i}",
+            "hostname": f"sw{i}",
+            "lastChangeAt": 100 - i,
+            "lastCheckAt": 100,
+            "status": "saved",
+            "hash": f"H{i}",
+        }
+        for i in range(3)
+    ]
+
+    def handler(request):
+        if request.url.path.endswith("/configuration/download"):
+            config = f"hostname {request.url.params['hash']}\n" * 100
+            return httpx.Response(status_code, text=config)
+        return httpx.Response(200, json={"data": records, "_meta": {"count": 3}})
+
+    return handler
+
+
+def test_fetch_device_configs_stream(make_client):
+    configs = {}
+
+    async def on_config(rec, chunks):
+        configs[rec["hostname"]] = "".join([chunk async for chunk in chunks])
+
+    async def main():
+        ipf = make_client(config_handler(), IPFConfigsMixin)
+        recs = await ipf.fetch_device_configs(on_config, since_ts=0, stream=True)
+        await ipf.api.aclose()
+        return recs
+
+    assert [rec["hostname"] for rec in asyncio.run(main())] == ["sw0", "sw1", "sw2"]
+    assert configs == {f"sw{i}": f"hostname H{i}\n" * 100 for i in range(3)}
+
+
+def test_fetch_device_configs_stream_error(make_client):
+    async def main():
+        ipf = make_client(config_handler(status_code=500), IPFConfigsMixin)
+        try:
+            await ipf.fetch_device_configs(ignore_config, since_ts=0, stream=True)
+        finally:
+            await ipf.api.aclose()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(main())
@@ -1,4 +1,6 @@
-from aioipfabric.filters import parse_filter
+import pytest
+
+from aioipfabric.filters import parse_filter, compile_filter, make_filter
 
 
 def test_simple_filter():
@@ -21,3 +23,96 @@ def test_group_filter_compound_and():
     inner = {"or": [{"hostname": ["eq", "Foo"]}, {"interface": ["eq", "bar"]}]}
     expected = {"and": [{"hostname": ["eq", "Boo"]}, inner]}
     assert res == expected
+
+
+def test_filter_cached_copy():
+    res = parse_filter("hostname = Foo")
+    res["hostname"][1] = "Bar"
+    assert parse_filter("hostname = Foo") == {"hostname": ["eq", "Foo"]}
+
+
+def test_filter_invalid():
+    with pytest.raises(ValueError):
+        parse_filter("and(hostname = Foo)")
+
+    with pytest.raises(RuntimeError):
+        parse_filter("hostname ? maybe")
+
+
+def test_filter_operator_case():
+    assert parse_filter("x net 10.0.0.0/8") == {"x": ["cidr", "10.0.0.0/8"]}
+    with pytest.raises(ValueError):
+        parse_filter("x NET 10.0.0.0/8")
+
+
+def test_group_filter_operator_case():
+    res = parse_filter("and(a = 1, x net 10.0.0.0/8)")
+    assert res == {"and": [{"a": ["eq", 1]}, {"x": ["cidr", "10.0.0.0/8"]}]}
+    with pytest.raises(ValueError):
+        parse_filter("and(a = 1, x NET 10.0.0.0/8)")
+
+
+def test_compile_filter():
+    by_host = compile_filter("and(hostname = {name}, vlan > {vlan}, site = '{name}')")
+    assert by_host(name="Foo", vlan=10) == {
+        "and": [
+            {"hostname": ["eq", "Foo"]},
+            {"vlan": ["gt", 10]},
+            {"site": ["eq", "Foo"]},
+        ]
+    }
+    assert by_host(name="Bar", vlan=20)["and"][0] == {"hostname": ["eq", "Bar"]}
+
+
+@pytest.mark.parametrize(
+    "oper, expected",
+    [
+        ("<", ["lt", 10]),
+        ("<=", ["lte", 10]),
+        (">", ["gt", 10]),
+        (">=", ["gte", 10]),
+        ("=", ["eq", 10]),
+        ("!=", ["neq", 10]),
+    ],
+)
+def test_filter_num_operators(oper, expected):
+    assert parse_filter(f"vlan {oper} 10") == {"vlan": expected}
+
+
+@pytest.mark.parametrize(
+    "col, oper, value",
+    [("hostname", "~", "sw1"), ("x", "?", "true"), ("x", "?", "False")],
+)
+def test_make_filter_parse_filter(col, oper, value):
+    assert make_filter(col, oper, value) == parse_filter(f"{col} {oper} {value}")
+
+
+def test_make_filter():
+    assert make_filter("x", "?", True) == {"x": ["empty", True]}
+    with pytest.raises(ValueError):
+        make_filter("x", "?", "maybe")
+    with pytest.raises(ValueError):
+        make_filter("hostname", "has", "sw1")
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "hostname = 'sw-{n}'",
+        "hostname ~ sw{n}",
+        "vlan = {n}{n}",
+        "x ? {n}",
+        "x ? '{n}'",
+    ],
+)
+def test_compile_filter_invalid_placeholder(template):
+    with pytest.raises(ValueError):
+        compile_filter(template)
+
+
+def test_compile_filter_values():
+    by_host = compile_filter("hostname = {name}")
+    with pytest.raises(KeyError):
+        by_host()
+    with pytest.raises(TypeError):
+        by_host(name="Foo", site="atl")
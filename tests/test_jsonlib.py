@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from aioipfabric import jsonlib
+from aioipfabric.jsonlib import aiter_items, dumps
+
+
+async def chunked(content, size=7):
+    for offset in range(0, len(content), size):
+        yield content[offset : offset + size]
+
+
+def collect_items(content, **kwargs):
+    async def main():
+        return [item async for item in aiter_items(chunked(content), **kwargs)]
+
+    return asyncio.run(main())
+
+
+BODY = dumps({"data": [{"id": n, "value": n / 2} for n in range(5)], "_meta": {}})
+
+
+def test_aiter_items_ijson():
+    pytest.importorskip("ijson")
+    assert collect_items(BODY) == [{"id": n, "value": n / 2} for n in range(5)]
+    assert collect_items(dumps({"rows": [1, 2]}), key="rows") == [1, 2]
+
+
+def test_aiter_items_fallback(monkeypatch):
+    monkeypatch.setattr(jsonlib, "ijson", None)
+    assert collect_items(BODY) == [{"id": n, "value": n / 2} for n in range(5)]
+    assert collect_items(dumps({"rows": [1, 2]}), key="rows") == [1, 2]